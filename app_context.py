@@ -0,0 +1,38 @@
+import logging
+import os
+from database import DatabaseManager
+from remote_database import RemoteDatabase
+from db_worker import DatabaseWorker
+from change_feed import ChangeFeed
+from image_cache import ImageCache
+
+logger = logging.getLogger(__name__)
+
+
+class AppContext:
+    """Services shared by the login, signup and dashboard windows for the whole session.
+
+    The database (with its reader pool and query cache), the background
+    worker, the change feed and the image cache are created once; windows
+    come and go and attach the worker to whichever one is current, so a
+    logout/login cycle reuses warm connections and caches. With server_url
+    the windows talk to a shared server.py instead of opening db_path.
+    """
+
+    def __init__(self, db_path, pool_size=4, query_cache_entries=128, max_changes=2000, server_url=None):
+        self.db_path = server_url or db_path
+        if server_url:
+            self.db = RemoteDatabase(server_url)
+        else:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self.db = DatabaseManager(db_path, pool_size=pool_size, query_cache_entries=query_cache_entries)
+        self.worker = DatabaseWorker()
+        self.change_feed = ChangeFeed(self.db, max_changes=max_changes)
+        self.images = ImageCache()
+        self.chart_data = None  # last category counts, drawn straight away by the next dashboard
+
+    def close(self):
+        self.change_feed.stop()
+        self.worker.shutdown()
+        self.db.close()
+        logger.info("Application context closed.")
@@ -0,0 +1,70 @@
+import argparse
+import datetime
+import os
+import sys
+from database import DatabaseManager
+from colorama import Fore, Style, init
+
+init(autoreset=True)
+
+
+def cutoff_date(before=None, keep_days=None, today=None):
+    """Return the archive cutoff (YYYY-MM-DD): an explicit date, or keep_days before today."""
+    if before:
+        return datetime.date.fromisoformat(before).isoformat()
+    today = today or datetime.date.today()
+    return (today - datetime.timedelta(days=keep_days)).isoformat()
+
+
+def run_archive(db, cutoff, batch_size=500, pause=0.05, vacuum=True, progress=None):
+    """Archive transactions before cutoff, then hand the freed pages back; returns stats."""
+    size = os.path.getsize(db.db_path)
+    moved = db.archive_transactions(cutoff, batch_size=batch_size, pause=pause, progress=progress)
+    freed = db.incremental_vacuum(pause=pause) if vacuum else 0
+    return {"moved": moved, "freed_pages": freed, "size_before": size, "size_after": os.path.getsize(db.db_path)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move old transactions into per-year archive databases.")
+    parser.add_argument("--db", default=os.path.join("db", "inventory.db"), help="database path")
+    parser.add_argument("--before", help="archive transactions dated before this day (YYYY-MM-DD)")
+    parser.add_argument("--keep-days", type=int, default=365,
+                        help="without --before, keep this many days of history live (default: 365)")
+    parser.add_argument("--batch-size", type=int, default=500, help="rows moved per transaction")
+    parser.add_argument("--pause", type=float, default=0.05, help="seconds to yield the writer between batches")
+    parser.add_argument("--no-vacuum", action="store_true", help="skip the incremental vacuum afterwards")
+    parser.add_argument("--enable-incremental-vacuum", action="store_true",
+                        help="switch an older database to incremental auto-vacuum first (one full VACUUM)")
+    args = parser.parse_args(argv)
+
+    cutoff = cutoff_date(args.before, args.keep_days)
+    db = DatabaseManager(args.db)
+    try:
+        if args.enable_incremental_vacuum:
+            print(Fore.YELLOW + "Rewriting the database for incremental auto-vacuum..." + Style.RESET_ALL)
+            db.enable_incremental_vacuum()
+        elif not args.no_vacuum and db._execute_query("PRAGMA auto_vacuum", fetch=True)[0][0] != 2:
+            print(Fore.YELLOW + "This database was created without incremental auto-vacuum, so freed space is "
+                  "reused but the file will not shrink. Run once with --enable-incremental-vacuum to change that."
+                  + Style.RESET_ALL)
+
+        def progress(year, moved):
+            print(f"\r{year}: {moved} transactions archived", end="", flush=True)
+
+        stats = run_archive(db, cutoff, args.batch_size, args.pause, not args.no_vacuum, progress)
+    finally:
+        db.close()
+
+    if stats["moved"]:
+        print()
+    total = sum(stats["moved"].values())
+    print(Fore.GREEN + f"Archived {total} transactions dated before {cutoff} "
+          f"({', '.join(f'{year}: {count}' for year, count in sorted(stats['moved'].items())) or 'none'})."
+          + Style.RESET_ALL)
+    print(Fore.GREEN + f"Database {stats['size_before'] / 1e6:.1f} MB -> {stats['size_after'] / 1e6:.1f} MB "
+          f"({stats['freed_pages']} pages freed)." + Style.RESET_ALL)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def _reader_method(name):
+    async def method(self, *args, **kwargs):
+        return await self._run_read(getattr(self.db, name), *args, **kwargs)
+    method.__name__ = name
+    method.__doc__ = f"Awaitable DatabaseManager.{name}, run on the reader pool."
+    return method
+
+
+def _writer_method(name):
+    async def method(self, *args, **kwargs):
+        return await self._run_write(getattr(self.db, name), *args, **kwargs)
+    method.__name__ = name
+    method.__doc__ = f"Awaitable DatabaseManager.{name}, serialized through the writer thread."
+    return method
+
+
+class AsyncDatabaseManager:
+    """asyncio facade over DatabaseManager.
+
+    Reads run on a thread pool backed by the reader connection pool; writes
+    are queued to a single writer thread. At most max_pending_writes writes
+    can be queued at once; further callers wait (without blocking the event
+    loop) until the writer catches up.
+    """
+
+    def __init__(self, db_path, readers=4, max_pending_writes=64, **options):
+        self.db = DatabaseManager(db_path, pool_size=readers, **options)
+        self.max_pending_writes = max_pending_writes
+        self._read_executor = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="lms-reader")
+        self._write_queue = queue.Queue()
+        self._write_slots = None
+        self._closed = False
+        self._writer_thread = threading.Thread(target=self._write_loop, name="lms-writer", daemon=True)
+        self._writer_thread.start()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _run_read(self, func, *args, **kwargs):
+        if self._closed:
+            raise RuntimeError("AsyncDatabaseManager is closed.")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._read_executor, partial(func, *args, **kwargs))
+
+    async def _run_write(self, func, *args, **kwargs):
+        if self._closed:
+            raise RuntimeError("AsyncDatabaseManager is closed.")
+        if self._write_slots is None:
+            self._write_slots = asyncio.Semaphore(self.max_pending_writes)
+        async with self._write_slots:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._write_queue.put((partial(func, *args, **kwargs), future, loop))
+            return await future
+
+    def _write_loop(self):
+        while True:
+            item = self._write_queue.get()
+            if item is _STOP:
+                return
+            call, future, loop = item
+            if future.cancelled():
+                continue
+            try:
+                result = call()
+            except BaseException as e:
+                loop.call_soon_threadsafe(_resolve, future, None, e)
+            else:
+                loop.call_soon_threadsafe(_resolve, future, result, None)
+
+    async def iter_tools(self, columns=None, where=None, order_by="tool_id", descending=False, page_size=500):
+        """Async generator over tools, fetching one keyset page at a time."""
+        after = None
+        while True:
+            rows, after = await self.fetch_tools_page(columns, where, order_by, descending, after, page_size)
+            for row in rows:
+                yield row
+            if after is None:
+                return
+
+    fetch_all_tools = _reader_method("fetch_all_tools")
+    fetch_tools_page = _reader_method("fetch_tools_page")
+    filter_tools = _reader_method("filter_tools")
+    filter_options = _reader_method("filter_options")
+    fetch_transactions_page = _reader_method("fetch_transactions_page")
+    fetch_tool_by_name = _reader_method("fetch_tool_by_name")
+    fetch_tools_by_status = _reader_method("fetch_tools_by_status")
+    search_tool = _reader_method("search_tool")
+    get_user = _reader_method("get_user")
+    count_tools = _reader_method("count_tools")
+    category_counts = _reader_method("category_counts")
+    status_counts = _reader_method("status_counts")
+    quantity_by_location = _reader_method("quantity_by_location")
+    change_version = _reader_method("change_version")
+    tool_changes_since = _reader_method("tool_changes_since")
+    tool_change_ids_since = _reader_method("tool_change_ids_since")
+
+    insert_tool = _writer_method("insert_tool")
+    insert_user = _writer_method("insert_user")
+    update_tool_quantity = _writer_method("update_tool_quantity")
+    delete_tool = _writer_method("delete_tool")
+    borrow_tool = _writer_method("borrow_tool")
+    return_tool = _writer_method("return_tool")
+    borrow_many = _writer_method("borrow_many")
+    return_many = _writer_method("return_many")
+    apply_operations = _writer_method("apply_operations")
+
+    async def close(self):
+        """Let queued writes finish, then stop the worker threads and close the database."""
+        if self._closed:
+            return
+        self._closed = True
+        loop = asyncio.get_running_loop()
+        self._write_queue.put(_STOP)
+        await loop.run_in_executor(None, self._writer_thread.join)
+        await loop.run_in_executor(None, partial(self._read_executor.shutdown, wait=True))
+        await loop.run_in_executor(None, self.db.close)
+        logger.info("AsyncDatabaseManager closed.")
+
+
+def _resolve(future, result, error):
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
@@ -0,0 +1,8 @@
+"""Benchmarks for DatabaseManager.
+
+    python -m benchmarks generate --scale 100k
+    python -m benchmarks run --scale 100k --out results.json
+    python -m benchmarks compare baseline.json results.json
+    python -m benchmarks startup --scale 1k --runs 5
+    python -m benchmarks http --scale 100k --clients 32 --duration 20
+"""
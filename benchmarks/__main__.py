@@ -0,0 +1,96 @@
+import argparse
+import json
+import logging
+import os
+import sys
+from benchmarks.dataset import SCALES, default_path, generate_scale
+from benchmarks.runner import compare, load, run, save
+from benchmarks import http_load, startup
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="DatabaseManager benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="create a synthetic dataset")
+    gen.add_argument("--scale", choices=SCALES, default="1k")
+    gen.add_argument("--path", help="output database (default: benchmarks/data/inventory_<scale>.db)")
+    gen.add_argument("--seed", type=int, default=42)
+
+    bench = sub.add_parser("run", help="time every DatabaseManager method")
+    bench.add_argument("--scale", choices=SCALES, default="1k")
+    bench.add_argument("--db", help="dataset to run against (default: the generated one for --scale)")
+    bench.add_argument("--iterations", type=int, default=200)
+    bench.add_argument("--pool-size", type=int, default=0)
+    bench.add_argument("--only", nargs="*", help="benchmark names to run")
+    bench.add_argument("--out", help="write the JSON report here (default: stdout)")
+    bench.add_argument("--baseline", help="compare against this saved report and fail on regressions")
+    bench.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, e.g. 0.10 for 10%%")
+
+    start = sub.add_parser("startup", help="time GUI cold start to the login window and dashboard")
+    start.add_argument("--scale", choices=SCALES, default="1k")
+    start.add_argument("--db", help="dataset to start against (default: the generated one for --scale)")
+    start.add_argument("--runs", type=int, default=5)
+    start.add_argument("--out", help="write the JSON report here (default: stdout)")
+    start.add_argument("--baseline", help="compare against this saved report and fail on regressions")
+    start.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, e.g. 0.10 for 10%%")
+
+    http = sub.add_parser("http", help="load test server.py with concurrent keep-alive clients")
+    http.add_argument("--scale", choices=SCALES, default="1k")
+    http.add_argument("--db", help="dataset to serve (default: the generated one for --scale)")
+    http.add_argument("--clients", type=int, default=16)
+    http.add_argument("--duration", type=float, default=10.0, help="seconds")
+    http.add_argument("--readers", type=int, default=4, help="server reader connections")
+    http.add_argument("--out", help="write the JSON report here (default: stdout)")
+    http.add_argument("--baseline", help="compare against this saved report and fail on regressions")
+    http.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, e.g. 0.10 for 10%%")
+
+    cmp_ = sub.add_parser("compare", help="compare two saved reports")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("current")
+    cmp_.add_argument("--threshold", type=float, default=0.10)
+    cmp_.add_argument("--metric", default="median_ms", choices=["median_ms", "p95_ms", "p99_ms"])
+
+    args = parser.parse_args(argv)
+    logging.getLogger("database").setLevel(logging.WARNING)
+    progress = lambda message: print(message, file=sys.stderr)
+
+    if args.command == "generate":
+        generate_scale(args.scale, args.path, args.seed, progress)
+        return 0
+
+    if args.command in ("run", "startup", "http"):
+        path = args.db or default_path(args.scale)
+        if not os.path.exists(path):
+            generate_scale(args.scale, path, progress=progress)
+        if args.command == "startup":
+            report = startup.run(path, args.runs, progress=progress)
+        elif args.command == "http":
+            report = http_load.run(path, args.clients, args.duration, args.readers, progress=progress)
+        else:
+            report = run(path, args.iterations, only=args.only, pool_size=args.pool_size, progress=progress)
+        if args.out:
+            save(report, args.out)
+        else:
+            print(json.dumps(report, indent=2))
+        if args.baseline:
+            return print_comparison(load(args.baseline), report, args.threshold, "median_ms")
+        return 0
+
+    return print_comparison(load(args.baseline), load(args.current), args.threshold, args.metric)
+
+
+def print_comparison(baseline, current, threshold, metric):
+    rows = compare(baseline, current, threshold, metric)
+    regressions = 0
+    print(f"{'benchmark':<28}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, before, after, change, regressed in rows:
+        regressions += regressed
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<28}{before:>12.3f}{after:>12.3f}{change:>+10.1%}{flag}")
+    print(f"{regressions} regression(s) above {threshold:.0%} ({metric})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
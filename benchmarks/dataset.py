@@ -0,0 +1,105 @@
+import datetime
+import os
+import random
+import sqlite3
+import time
+from itertools import islice
+from database import DatabaseManager, TOOL_CONDITIONS
+
+# scale name -> (tools, transactions, users)
+SCALES = {
+    "1k": (1_000, 10_000, 100),
+    "100k": (100_000, 1_000_000, 1_000),
+    "1m": (1_000_000, 10_000_000, 10_000),
+}
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+NOUNS = ["Hammer", "Wrench", "Drill", "Saw", "Pliers", "Screwdriver", "Chisel", "Clamp", "Level", "Multimeter",
+         "Soldering Iron", "Oscilloscope", "Tape Measure", "File", "Socket Set", "Crimper", "Heat Gun", "Caliper"]
+ADJECTIVES = ["Heavy", "Mini", "Cordless", "Precision", "Digital", "Adjustable", "Insulated", "Long", "Compact"]
+CATEGORIES = ["Hand Tools", "Power Tools", "Measuring", "Electronics", "Cutting", "Fastening", "Safety",
+              "Welding", "Plumbing", "Painting", "Gardening", "Automotive"]
+CHUNK = 50_000
+
+
+def default_path(scale):
+    return os.path.join(DATA_DIR, f"inventory_{scale}.db")
+
+
+def _chunks(rows, size=CHUNK):
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _tools(rng, count, users):
+    for i in range(1, count + 1):
+        name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}"
+        location = f"Room {rng.randint(1, 40)} Shelf {rng.randint(1, 12)}"
+        if rng.random() < 0.2:
+            yield (name, rng.choice(CATEGORIES), rng.choice(TOOL_CONDITIONS), rng.randint(0, 3), location,
+                   "borrowed", f"Borrower {rng.randint(1, users)}", "2024-01-15", rng.randint(1, users))
+        else:
+            yield (name, rng.choice(CATEGORIES), rng.choice(TOOL_CONDITIONS), rng.randint(1, 25), location,
+                   "available", None, None, None)
+
+
+def _transactions(rng, count, tools, users):
+    start = datetime.datetime(2015, 1, 1)
+    step = max(1, int(10 * 365 * 86400 / max(count, 1)))
+    for i in range(count):
+        when = start + datetime.timedelta(seconds=i * step)
+        yield (rng.randint(1, tools), rng.randint(1, users), "borrow" if i % 2 == 0 else "return",
+               when.strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def generate(path, tools, transactions, users, seed=42, progress=print):
+    """Create a reproducible synthetic database at path using the normal schema."""
+    if os.path.exists(path):
+        os.remove(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    db = DatabaseManager(path, synchronous="OFF")
+    try:
+        with db.transaction() as conn:
+            conn.executemany("INSERT INTO users (username, password, name, age, email) VALUES (?, ?, ?, ?, ?)",
+                             ((f"user{i}", f"pass{i}", f"User {i}", 18 + i % 50, f"user{i}@example.com")
+                              for i in range(1, users + 1)))
+        for done, chunk in enumerate(_chunks(_tools(rng, tools, users)), start=1):
+            with db.transaction() as conn:
+                conn.executemany("""INSERT INTO tools (name, category, condition, quantity, location, status,
+                                    borrower, borrow_date, user_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""", chunk)
+            progress(f"tools: {min(done * CHUNK, tools)}/{tools}")
+        for done, chunk in enumerate(_chunks(_transactions(rng, transactions, tools, users)), start=1):
+            with db.transaction() as conn:
+                conn.executemany("""INSERT INTO transactions (tool_id, user_id, transaction_type, transaction_date)
+                                    VALUES (?, ?, ?, ?)""", chunk)
+            if done % 20 == 0 or done * CHUNK >= transactions:
+                progress(f"transactions: {min(done * CHUNK, transactions)}/{transactions}")
+        with db._writer() as conn:
+            conn.execute("ANALYZE")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        db.close()
+    progress(f"Generated {path} in {time.perf_counter() - started:.1f}s")
+    return path
+
+
+def generate_scale(scale, path=None, seed=42, progress=print):
+    tools, transactions, users = SCALES[scale]
+    return generate(path or default_path(scale), tools, transactions, users, seed, progress)
+
+
+def dataset_info(path):
+    """Row counts of an existing dataset, used to size benchmark inputs."""
+    conn = sqlite3.connect(path)
+    try:
+        return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("tools", "users", "transactions")}
+    finally:
+        conn.close()
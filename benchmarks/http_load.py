@@ -0,0 +1,164 @@
+"""Load test for server.py: many keep-alive clients against a local instance.
+
+The server is started as a subprocess on a scratch copy of the dataset and
+each client thread runs a mixed workload through RemoteDatabase (the same
+adapter the GUI and CLI use): page through tools, search, read the
+dashboard counts, and borrow then return a tool reserved for it (logged in
+as the dataset's first user, since writes need a session). Finally
+the server is sent SIGTERM and must drain and exit cleanly.
+"""
+import datetime
+import os
+import platform
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from benchmarks.dataset import dataset_info
+from benchmarks.runner import percentile
+from database import DatabaseManager
+from remote_database import RemoteDatabase
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# operation -> relative weight in the mix
+WORKLOAD = {"tools_page": 4, "search": 3, "counts": 2, "by_name": 2, "borrow_return": 1, "batch": 1}
+
+
+def start_server(db_path, readers=4, timeout=30.0):
+    """Start server.py on a free port; returns (process, base_url)."""
+    process = subprocess.Popen([sys.executable, "server.py", "--db", db_path, "--port", "0",
+                                "--readers", str(readers)], cwd=ROOT, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        line = process.stdout.readline()
+        if line.startswith("Listening on "):
+            return process, line.split()[-1]
+        if not line and process.poll() is not None:
+            break
+    process.kill()
+    raise RuntimeError("server.py did not start")
+
+
+def _client(base_url, fx, client_id, until, samples, errors):
+    db = RemoteDatabase(base_url)
+    rng = random.Random(client_id)
+    operations = [name for name, weight in WORKLOAD.items() for _ in range(weight)]
+    tool_id = fx["borrowable"][client_id]
+    user_id, username, password = fx["user"]
+    try:
+        if not db.get_user(username, password):
+            errors.append(f"login: cannot log in as {username}")
+            return
+        while time.perf_counter() < until:
+            name = rng.choice(operations)
+            started = time.perf_counter()
+            try:
+                if name == "tools_page":
+                    db.fetch_tools_page(after=(None, rng.randint(1, fx["tools"])), limit=100)
+                elif name == "search":
+                    db.search_tool(rng.choice(fx["words"]), limit=20)
+                elif name == "counts":
+                    db.count_tools()
+                    db.category_counts()
+                elif name == "by_name":
+                    db.fetch_tool_by_name(rng.choice(fx["names"]))
+                elif name == "borrow_return":
+                    db.borrow_tool(tool_id, user_id, f"Load {client_id}", fx["today"])
+                    if not db.return_tool(tool_id, user_id, fx["today"]):
+                        raise RuntimeError("return failed")
+                else:
+                    db.batch([("GET", "/tools/count", None), ("GET", "/tools/categories", None),
+                              ("GET", "/tools/statuses", None)])
+            except Exception as e:
+                errors.append(f"{name}: {e}")
+                continue
+            samples.setdefault(name, []).append(time.perf_counter() - started)
+    finally:
+        db.close()
+
+
+def run(dataset_path, clients=16, duration=10.0, readers=4, progress=print):
+    """Load a local server with clients threads for duration seconds; returns a report like runner.run."""
+    info = dataset_info(dataset_path)
+    workdir = tempfile.mkdtemp(prefix="lms-http-")
+    scratch = os.path.join(workdir, "http.db")
+    shutil.copyfile(dataset_path, scratch)
+    process = None
+    try:
+        db = DatabaseManager(scratch)
+        db.create_tables()
+        names = [row[0] for row in db._execute_query("SELECT name FROM tools ORDER BY tool_id LIMIT 1000",
+                                                     fetch=True)] or ["missing"]
+        user = db._execute_query("SELECT id, username, password FROM users ORDER BY id LIMIT 1", fetch=True)
+        if not user:
+            raise RuntimeError(f"{dataset_path} has no users to log in as")
+        with db.transaction() as conn:
+            start = conn.execute("SELECT IFNULL(MAX(tool_id), 0) FROM tools").fetchone()[0] + 1
+            conn.executemany("INSERT INTO tools (name, category, condition, quantity, location) VALUES (?, ?, ?, ?, ?)",
+                             ((f"Load Tool {i}", "Benchmark", "Good", 1_000_000, "Bench") for i in range(clients)))
+        db.close()
+        fx = {"tools": max(info["tools"], 1), "names": names, "today": datetime.date.today().isoformat(),
+              "words": [word for name in names for word in name.split()[1:2]] or ["tool"],
+              "borrowable": list(range(start, start + clients)), "user": user[0]}
+
+        process, base_url = start_server(scratch, readers)
+        progress(f"server at {base_url}; {clients} clients for {duration:.0f}s")
+        per_client, errors = [{} for _ in range(clients)], []
+        until = time.perf_counter() + duration
+        started = time.perf_counter()
+        threads = [threading.Thread(target=_client, args=(base_url, fx, i, until, per_client[i], errors))
+                   for i in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        monitor = RemoteDatabase(base_url)
+        server_metrics = monitor.metrics()
+        monitor.close()
+        process.send_signal(signal.SIGTERM)
+        exit_code = process.wait(timeout=30)
+    finally:
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    samples = {}
+    for client_samples in per_client:
+        for name, values in client_samples.items():
+            samples.setdefault(name, []).extend(values)
+    results = {}
+    for name, values in sorted(samples.items()):
+        values.sort()
+        results[f"http_{name}"] = {"iterations": len(values), "median_ms": percentile(values, 50) * 1000,
+                                   "p95_ms": percentile(values, 95) * 1000, "p99_ms": percentile(values, 99) * 1000,
+                                   "min_ms": values[0] * 1000}
+        progress(f"http_{name:<22}{results[f'http_{name}']['median_ms']:>10.3f} ms median"
+                 f"{results[f'http_{name}']['p99_ms']:>10.3f} ms p99")
+    total = sum(len(values) for values in samples.values())
+    progress(f"{total / elapsed:.0f} operations/sec, {len(errors)} errors, server exit code {exit_code}")
+    return {
+        "meta": {
+            "dataset": os.path.abspath(dataset_path),
+            "rows": info,
+            "clients": clients,
+            "duration_sec": round(elapsed, 3),
+            "readers": readers,
+            "operations_per_sec": round(total / elapsed, 1) if elapsed else 0.0,
+            "errors": len(errors),
+            "first_errors": errors[:10],
+            "clean_shutdown": exit_code == 0,
+            "server_metrics": server_metrics,
+            "python": platform.python_version(),
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
@@ -0,0 +1,147 @@
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from database import DatabaseManager
+from benchmarks.dataset import dataset_info
+
+
+# Benchmarks whose inputs are consumed in order, so an extra warm-up call would shift them.
+NO_WARMUP = {"borrow_tool", "return_tool", "delete_tool"}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    total = sum(samples)
+    return {
+        "iterations": len(samples),
+        "median_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "ops_per_sec": len(samples) / total if total else 0.0,
+    }
+
+
+class Fixture:
+    """Random inputs drawn from the dataset plus tools reserved for write benchmarks."""
+
+    def __init__(self, db, info, iterations, seed):
+        self.rng = random.Random(seed)
+        self.tools = max(info["tools"], 1)
+        self.users = max(info["users"], 1)
+        self.names = [row[0] for row in db._execute_query(
+            "SELECT name FROM tools ORDER BY tool_id LIMIT 1000", fetch=True)] or ["missing"]
+        self.logins = db._execute_query("SELECT username, password FROM users LIMIT 1000", fetch=True) or [("x", "x")]
+        with db.transaction() as conn:
+            start = conn.execute("SELECT IFNULL(MAX(tool_id), 0) FROM tools").fetchone()[0] + 1
+            conn.executemany("INSERT INTO tools (name, category, condition, quantity, location) VALUES (?, ?, ?, ?, ?)",
+                             ((f"Bench Tool {i}", "Benchmark", "Good", 1_000_000, "Bench")
+                              for i in range(iterations * 2)))
+        self.borrowable = list(range(start, start + iterations))
+        self.deletable = list(range(start + iterations, start + iterations * 2))
+        self.today = datetime.date.today().isoformat()
+
+    def tool_id(self):
+        return self.rng.randint(1, self.tools)
+
+    def user_id(self):
+        return self.rng.randint(1, self.users)
+
+
+def _benchmarks(fx):
+    """(name, callable(db, i), iteration divisor) for every public DatabaseManager operation."""
+    return [
+        ("fetch_all_tools", lambda db, i: db.fetch_all_tools(), 50),
+        ("fetch_tools_page", lambda db, i: db.fetch_tools_page(after=(None, fx.tool_id()), limit=100), 1),
+        ("fetch_tool_by_name", lambda db, i: db.fetch_tool_by_name(fx.rng.choice(fx.names)), 1),
+        ("fetch_tools_by_status", lambda db, i: db.fetch_tools_by_status("borrowed", fx.user_id()), 1),
+        ("fetch_tools_by_status_all", lambda db, i: db.fetch_tools_by_status("available"), 50),
+        ("search_tool", lambda db, i: db.search_tool(fx.rng.choice(fx.names).split()[1], limit=20), 1),
+        ("category_counts", lambda db, i: db.category_counts(), 1),
+        ("get_user", lambda db, i: db.get_user(*fx.rng.choice(fx.logins)), 1),
+        ("insert_tool", lambda db, i: db.insert_tool(f"Inserted {i}", "Benchmark", "Good", 1, "Bench"), 1),
+        ("update_tool_quantity", lambda db, i: db.update_tool_quantity(fx.borrowable[i], 1_000_000), 1),
+        ("borrow_tool", lambda db, i: db.borrow_tool(fx.borrowable[i], 1, "Bench", fx.today), 1),
+        ("return_tool", lambda db, i: db.return_tool(fx.borrowable[i], 1, fx.today), 1),
+        ("borrow_many_10", lambda db, i: db.borrow_many(
+            [(tool_id, 1, "Bench", fx.today) for tool_id in fx.borrowable[i:i + 10]]), 10),
+        ("delete_tool", lambda db, i: db.delete_tool(fx.deletable[i]), 1),
+    ]
+
+
+def run(dataset_path, iterations=200, seed=7, only=None, pool_size=0, progress=print):
+    """Time each DatabaseManager method against a scratch copy of dataset_path."""
+    info = dataset_info(dataset_path)
+    workdir = tempfile.mkdtemp(prefix="lms-bench-")
+    scratch = os.path.join(workdir, "bench.db")
+    shutil.copyfile(dataset_path, scratch)
+    results = {}
+    db = DatabaseManager(scratch, pool_size=pool_size)
+    try:
+        fx = Fixture(db, info, iterations, seed)
+        for name, call, divisor in _benchmarks(fx):
+            if only and name not in only:
+                continue
+            count = max(3, iterations // divisor)
+            if name not in NO_WARMUP:
+                call(db, 0)
+            samples = []
+            for i in range(count):
+                started = time.perf_counter()
+                call(db, i)
+                samples.append(time.perf_counter() - started)
+            results[name] = summarize(samples)
+            progress(f"{name:<28}{results[name]['median_ms']:>10.3f} ms median"
+                     f"{results[name]['ops_per_sec']:>12.0f} ops/s")
+    finally:
+        db.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "meta": {
+            "dataset": os.path.abspath(dataset_path),
+            "rows": info,
+            "iterations": iterations,
+            "pool_size": pool_size,
+            "sqlite_version": sqlite3.sqlite_version,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=0.10, metric="median_ms"):
+    """Return rows of (name, baseline, current, change, regressed) for benchmarks in both runs."""
+    rows = []
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        before = baseline["results"][name][metric]
+        after = result[metric]
+        change = (after - before) / before if before else 0.0
+        rows.append((name, before, after, change, change > threshold))
+    return rows
+
+
+def load(path):
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save(report, path):
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
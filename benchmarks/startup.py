@@ -0,0 +1,100 @@
+"""GUI cold-start timings: time to the login window and to a populated dashboard.
+
+Every sample starts a fresh interpreter, so imports, image decoding and the
+first database reads are paid each time, as on a freshly started lab PC.
+Needs a display.
+"""
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MILESTONES = ("imported", "login_window", "dashboard", "dashboard_ready")
+
+
+def _child(db_path, user_id, started, timeout=60.0):
+    """Run inside the sampled process: drive the real windows and print the milestones as JSON."""
+    marks = {}
+    elapsed = lambda: (time.time() - started) * 1000
+
+    import customtkinter as ctk
+    import gui
+    marks["imported"] = elapsed()
+
+    # Build each window but return from mainloop() so the windows can be pumped from here
+    ctk.CTk.mainloop = lambda self, *args, **kwargs: None
+    context = gui.AppContext(db_path)
+
+    login = gui.LoginApp(context)
+    login.login_window.update()
+    marks["login_window"] = elapsed()
+    login.worker.detach()
+    login.login_window.destroy()
+
+    app = gui.ToolManagementApp(user_id, context)
+    app.window.update()
+    marks["dashboard"] = elapsed()
+
+    # Ready once the first page of the inventory and the pie chart have been drawn
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        app.window.update()
+        table = app.inventory_table
+        rows_shown = table.tree.get_children() or (app.seen_version is not None and table.total == 0)
+        if rows_shown and app.pie_chart is not None and app.worker.pending == 0:
+            marks["dashboard_ready"] = elapsed()
+            break
+        time.sleep(0.002)
+    app.window.destroy()
+    context.close()
+    print(json.dumps(marks))
+
+
+def sample(db_path, user_id=1, timeout=60.0):
+    """Start one GUI process and return its milestones in ms since launch."""
+    started = time.time()
+    code = "import sys; from benchmarks.startup import _child; _child(sys.argv[1], int(sys.argv[2]), float(sys.argv[3]))"
+    result = subprocess.run([sys.executable, "-c", code, db_path, str(user_id), repr(started)],
+                            cwd=ROOT, capture_output=True, text=True, timeout=timeout + 30)
+    if result.returncode != 0:
+        raise RuntimeError(f"GUI startup sample failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(dataset_path, runs=5, progress=print):
+    """Time GUI startup against a scratch copy of dataset_path; returns a report like runner.run."""
+    from database import DatabaseManager
+
+    workdir = tempfile.mkdtemp(prefix="lms-startup-")
+    scratch = os.path.join(workdir, "startup.db")
+    shutil.copyfile(dataset_path, scratch)
+    try:
+        # Apply any pending migrations up front so they are not counted as startup time
+        db = DatabaseManager(scratch)
+        db.create_tables()
+        user = db._execute_query("SELECT id FROM users ORDER BY id LIMIT 1", fetch=True)
+        db.close()
+        user_id = user[0][0] if user else 1
+
+        samples = []
+        for i in range(runs):
+            samples.append(sample(scratch, user_id))
+            progress(f"run {i + 1}/{runs}: " + ", ".join(f"{name} {samples[-1].get(name, float('nan')):.0f} ms"
+                                                          for name in MILESTONES))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {}
+    for name in MILESTONES:
+        values = sorted(s[name] for s in samples if name in s)
+        if values:
+            results[f"startup_{name}"] = {"iterations": len(values), "median_ms": statistics.median(values),
+                                          "p95_ms": values[-1], "p99_ms": values[-1], "min_ms": values[0]}
+    return {"meta": {"dataset": os.path.abspath(dataset_path), "runs": runs, "python": sys.version.split()[0],
+                     "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")},
+            "results": results}
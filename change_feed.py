@@ -0,0 +1,100 @@
+import logging
+import threading
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# changed/deleted are lists of tool ids; both are None when too many tools
+# changed at once and subscribers should reload instead.
+ChangeEvent = namedtuple("ChangeEvent", ["version", "changed", "deleted"])
+
+
+class ChangeFeed:
+    """Tells subscribers which tools changed, whichever process changed them.
+
+    A background thread reads PRAGMA data_version on its own connection every
+    interval seconds. That value only moves when some other connection
+    commits, so an idle database costs one pragma per tick; the tool change
+    log is read only after a commit, and an event is published only if tools
+    were actually added, edited or deleted.
+    """
+
+    def __init__(self, db, interval=0.5, max_changes=2000):
+        self.db = db
+        self.interval = interval
+        self.max_changes = max_changes
+        self.version = None
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._conn = None
+        self._data_version = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, callback):
+        """Call callback(ChangeEvent) from the feed thread on every change; returns an unsubscribe function."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def start(self, version=None):
+        """Start polling from version (read from the database if not given and not yet known)."""
+        if self._thread is None:
+            if self.version is None:
+                self.version = version if version is not None else self.db.change_version()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="lms-change-feed", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            self._data_version = None
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Change feed poll failed: {e}")
+
+    def _committed(self):
+        """True if anything may have been committed since the last check."""
+        if self.db.is_memory or self.db.is_remote:
+            return True  # no connection of our own to watch; just read the log
+        if self._conn is None:
+            self._conn = self.db._open_connection(read_only=True)
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        committed = data_version != self._data_version
+        self._data_version = data_version
+        return committed
+
+    def poll(self):
+        """Check once for changes; publishes and returns the ChangeEvent, or None."""
+        if self.version is None:
+            self.version = self.db.change_version()
+        if not self._committed():
+            return None
+        latest, changed, deleted = self.db.tool_change_ids_since(self.version, self.max_changes)
+        if latest == self.version:
+            return None
+        self.version = latest
+        event = ChangeEvent(latest, changed, deleted)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Change feed subscriber failed: {e}")
+        return event
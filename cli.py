@@ -1,11 +1,22 @@
 import os
+import argparse
+import csv
 import datetime
+import getpass
+import json
+import logging
+import shutil
+import sys
 from database import DatabaseManager
-from colorama import Fore, Style, init
+from remote_database import RemoteDatabase
+from query_profiler import QueryProfiler
+from colorama import Fore, Style, init, deinit
 import traceback
 
 init(autoreset=True)
 
+SQL_CONSOLE_ROW_CAP = 1000  # rows printed by the admin SQL console before it stops reading
+
 # New ASCII Art Banner for Project-LMS
 def print_banner():
     banner = '''
@@ -86,19 +97,19 @@ def handle_add_tool(db):
 
 def handle_view_tools(db):
     try:
-        tools = db.fetch_all_tools()
-        if not tools:
+        found = False
+        for tool in db.iter_tools(columns=("tool_id", "name", "category", "condition", "quantity", "location")):
+            found = True
+            tool_id = tool[0] if tool[0] is not None else 'N/A'
+            name = tool[1] if tool[1] is not None else 'N/A'
+            category = tool[2] if tool[2] is not None else 'N/A'
+            condition = tool[3] if tool[3] is not None else 'N/A'
+            quantity = tool[4] if tool[4] is not None else 'N/A'
+            location = tool[5] if tool[5] is not None else 'N/A'
+
+            print(Fore.CYAN + f"Tool ID: {tool_id}, Name: {name}, Category: {category}, Condition: {condition}, Quantity: {quantity}, Location: {location}")
+        if not found:
             print(Fore.YELLOW + "No tools found in the inventory.")
-        else:
-            for tool in tools:
-                tool_id = tool[0] if tool[0] is not None else 'N/A'
-                name = tool[1] if tool[1] is not None else 'N/A'
-                category = tool[2] if tool[2] is not None else 'N/A'
-                condition = tool[3] if tool[3] is not None else 'N/A'
-                quantity = tool[4] if tool[4] is not None else 'N/A'
-                location = tool[5] if tool[5] is not None else 'N/A'
-
-                print(Fore.CYAN + f"Tool ID: {tool_id}, Name: {name}, Category: {category}, Condition: {condition}, Quantity: {quantity}, Location: {location}")
     except Exception as e:
         print(Fore.RED + f"Error fetching tools: {e}" + Style.RESET_ALL)
 
@@ -206,24 +217,101 @@ def handle_clear_data(db):
     else:
         print(Fore.YELLOW + "Operation cancelled.")
 
+def print_query_plan(plan):
+    if not plan:
+        return
+    depth = {0: -1}
+    print(Fore.CYAN + "\nQuery Plan:")
+    for step in plan:
+        depth[step.id] = depth.get(step.parent, -1) + 1
+        line = "  " * (depth[step.id] + 1) + step.detail
+        if step.full_scan:
+            print(Fore.RED + f"{line:<60} <- FULL SCAN of {step.table}" + Style.RESET_ALL)
+        else:
+            print(Fore.CYAN + line)
+
+
+def print_query_profile(sql_command, stats, shown):
+    # A full scan cut short by LIMIT or by the row cap visits fewer rows than the table holds
+    partial = shown < stats["rows_returned"] or " limit " in f" {sql_command.lower()} "
+    parts = [f"{stats['wall_ms']:.2f} ms"]
+    if stats["first_row_ms"] is not None and stats["rows_returned"]:
+        parts.append(f"first row {stats['first_row_ms']:.2f} ms")
+    if stats["rows_affected"] is not None:
+        if stats["rows_affected"] >= 0:
+            parts.append(f"{stats['rows_affected']} rows affected")
+    else:
+        returned = f"{stats['rows_returned']} rows returned"
+        parts.append(f"{returned}, {shown} shown (stopped early)" if shown < stats["rows_returned"] else returned)
+    if stats["rows_scanned"] is None:
+        parts.append("rows scanned unavailable")
+    elif stats["rows_scanned"]:
+        parts.append(f"{'up to ' if partial else ''}~{stats['rows_scanned']:,} rows scanned")
+    parts.append(f"~{stats['vm_steps']:,} VM steps")
+    if stats["statements"] > 1:
+        parts.append(f"{stats['statements']} statements incl. triggers")
+    print(Fore.GREEN + "\nProfile: " + " | ".join(parts) + Style.RESET_ALL)
+    if not partial and stats["rows_returned"] and (stats["rows_scanned"] or 0) > 10 * stats["rows_returned"]:
+        print(Fore.YELLOW + f"Scanned about {stats['rows_scanned'] // stats['rows_returned']:,}x more rows than "
+              f"returned." + Style.RESET_ALL)
+    if stats["suggestions"]:
+        print(Fore.YELLOW + "Suggested index:" + Style.RESET_ALL)
+        for suggestion in stats["suggestions"]:
+            print(Fore.YELLOW + "  " + suggestion + Style.RESET_ALL)
+
+
+def page_sql_results(stats, first, batches):
+    """Print rows as they arrive, a screen at a time, up to SQL_CONSOLE_ROW_CAP; returns the rows shown."""
+    page_size = max(5, shutil.get_terminal_size().lines - 3)
+    paging = sys.stdin.isatty() and sys.stdout.isatty()
+    shown = on_page = 0
+    print(Fore.CYAN + "\nQuery Results:")
+    print(Fore.CYAN + Style.BRIGHT + "\t".join(stats["columns"]) + Style.RESET_ALL)
+    batch = first
+    while batch:
+        for row in batch:
+            if shown >= SQL_CONSOLE_ROW_CAP:
+                print(Fore.YELLOW + f"-- Stopped at {SQL_CONSOLE_ROW_CAP} rows; add a WHERE or LIMIT to see others."
+                      + Style.RESET_ALL)
+                return shown
+            if paging and on_page >= page_size:
+                answer = input(Fore.YELLOW + "-- More -- [Enter] next page, [a] all, [q] quit: " + Style.RESET_ALL)
+                if answer.strip().lower() == "q":
+                    return shown
+                on_page = 0
+                paging = answer.strip().lower() != "a"
+            print(Fore.CYAN + "\t".join(map(str, row)))
+            shown += 1
+            on_page += 1
+        batch = next(batches, None)
+    return shown
+
+
 def handle_execute_sql(db):
+    sql_command = input(Fore.YELLOW + "Enter SQL command to execute: ").strip()
+    if not sql_command:
+        return
+    stats = {}
+    batches = QueryProfiler(db).run(sql_command, stats)
     try:
-        sql_command = input(Fore.YELLOW + "Enter SQL command to execute: ").strip()
-        if sql_command.lower().startswith("select"):
-            # For SELECT queries, fetch and display results
-            results = db._execute_query(sql_command, fetch=True)
-            if not results:
-                print(Fore.YELLOW + "No results found.")
-            else:
-                print(Fore.CYAN + "\nQuery Results:")
-                for row in results:
-                    print(Fore.CYAN + "\t".join(map(str, row)))
-        else:
-            # For non-SELECT queries, just execute
-            db._execute_query(sql_command)
+        first = next(batches, None)  # runs the statement; the plan is ready by now
+        print_query_plan(stats["plan"])
+        if stats["rows_affected"] is not None:
             print(Fore.GREEN + "SQL command executed successfully!" + Style.RESET_ALL)
+            shown = 0
+        elif first is None and not stats.get("columns"):
+            shown = 0
+        elif first is None:
+            print(Fore.YELLOW + "No results found.")
+            shown = 0
+        else:
+            shown = page_sql_results(stats, first, batches)
     except Exception as e:
         print(Fore.RED + f"Error executing SQL command: {e}" + Style.RESET_ALL)
+        return
+    finally:
+        batches.close()  # stops the statement if the results were not read to the end
+    print_query_profile(sql_command, stats, shown)
 
 
 def account_login(db):
@@ -240,8 +328,8 @@ def account_login(db):
         print(Fore.RED + "Invalid username or password. Please try again." + Style.RESET_ALL)
         return False
 
-if __name__ == "__main__":
-    db = DatabaseManager('db/inventory.db')
+def run_interactive(db_path):
+    db = DatabaseManager(db_path)
     
     print_banner()  
     
@@ -274,3 +362,285 @@ if __name__ == "__main__":
             break
         else:
             print(Fore.RED + "Invalid choice. Please try again.")
+
+
+# ---------------------------------------------------------------------------
+# Non-interactive subcommands
+# ---------------------------------------------------------------------------
+
+TOOL_LIST_COLUMNS = ("tool_id", "name", "category", "condition", "quantity", "location", "status")
+TRANSACTION_COLUMNS = ("transaction_id", "tool_id", "user_id", "transaction_type", "transaction_date")
+TABLE_SAMPLE_ROWS = 100  # rows buffered to size the table columns before streaming the rest
+TABLE_MAX_WIDTH = 40
+
+
+class JsonlWriter:
+    def __init__(self, columns, out):
+        self.columns = columns
+        self.out = out
+
+    def write(self, row):
+        self.out.write(json.dumps(dict(zip(self.columns, row)), default=str) + "\n")
+
+    def close(self):
+        self.out.flush()
+
+
+class CsvWriter:
+    def __init__(self, columns, out):
+        self.writer = csv.writer(out)
+        self.writer.writerow(columns)
+        self.out = out
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        self.out.flush()
+
+
+class TableWriter:
+    """Aligned columns sized from the first rows; later rows are streamed and clipped to fit."""
+
+    def __init__(self, columns, out):
+        self.columns = columns
+        self.out = out
+        self.pending = []
+        self.widths = None
+
+    def write(self, row):
+        if self.widths is not None:
+            self._print(row)
+            return
+        self.pending.append(row)
+        if len(self.pending) >= TABLE_SAMPLE_ROWS:
+            self._flush_pending()
+
+    def _flush_pending(self):
+        self.widths = [min(TABLE_MAX_WIDTH, max([len(str(column))] + [len(_cell(row[i])) for row in self.pending]))
+                       for i, column in enumerate(self.columns)]
+        self._print(self.columns)
+        self.out.write("  ".join("-" * width for width in self.widths) + "\n")
+        for row in self.pending:
+            self._print(row)
+        self.pending = []
+
+    def _print(self, row):
+        cells = []
+        for value, width in zip(row, self.widths):
+            text = _cell(value)
+            if len(text) > width:
+                text = text[:width - 1] + "~"
+            cells.append(text.rjust(width) if isinstance(value, (int, float)) else text.ljust(width))
+        self.out.write("  ".join(cells).rstrip() + "\n")
+
+    def close(self):
+        if self.widths is None:
+            self._flush_pending()
+        self.out.flush()
+
+
+WRITERS = {"jsonl": JsonlWriter, "csv": CsvWriter, "table": TableWriter}
+
+
+def _cell(value):
+    return "" if value is None else str(value)
+
+
+def emit(args, columns, rows):
+    """Stream rows to stdout in the chosen format as they are produced; returns the row count."""
+    writer = WRITERS[args.format](columns, sys.stdout)
+    count = 0
+    try:
+        for row in rows:
+            writer.write(row)
+            count += 1
+    finally:
+        if hasattr(rows, "close"):
+            rows.close()  # release the cursor if output stopped early
+    writer.close()
+    return count
+
+
+def iter_tool_rows(db, args):
+    after = None
+    while True:
+        rows, after = db.filter_tools(condition=args.condition, category=args.category, name_prefix=args.name_prefix,
+                                      status=args.status, columns=TOOL_LIST_COLUMNS, after=after, limit=args.page_size)
+        yield from rows
+        if after is None:
+            return
+
+
+def cmd_tools_list(db, args, user_id):
+    emit(args, TOOL_LIST_COLUMNS, iter_tool_rows(db, args))
+    return 0
+
+
+def cmd_tools_add(db, args, user_id):
+    if db.fetch_tool_by_name(args.name):
+        print(f"A tool named '{args.name}' already exists.", file=sys.stderr)
+        return 1
+    try:
+        ok = db.insert_tool(args.name, args.category, args.condition, args.quantity, args.location)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    emit(args, ("name", "added"), [(args.name, ok)])
+    return 0 if ok else 1
+
+
+def cmd_borrow(db, args, user_id):
+    try:
+        db.borrow_tool(args.tool_id, user_id, args.borrower or args.user, args.date)
+        ok, message = True, ""
+    except Exception as e:
+        ok, message = False, str(e)
+    emit(args, ("tool_id", "action", "ok", "message"), [(args.tool_id, "borrow", ok, message)])
+    return 0 if ok else 1
+
+
+def cmd_return(db, args, user_id):
+    ok = db.return_tool(args.tool_id, user_id, args.date)
+    message = "" if ok else "Tool is not currently borrowed."
+    emit(args, ("tool_id", "action", "ok", "message"), [(args.tool_id, "return", ok, message)])
+    return 0 if ok else 1
+
+
+def cmd_search(db, args, user_id):
+    columns = ("tool_id", "name", "category", "condition", "quantity", "location", "status",
+               "borrower", "borrow_date", "user_id")
+    emit(args, columns, (row[:len(columns)] for row in db.search_tool(args.keyword, limit=args.limit)))
+    return 0
+
+
+def cmd_tx_list(db, args, user_id):
+    emit(args, TRANSACTION_COLUMNS, db.iter_transactions(args.since, args.tool, args.user_id))
+    return 0
+
+
+def cmd_replay(db, args, user_id):
+    import replay
+
+    rejects = open(args.rejects, "w", encoding="utf-8") if args.rejects else sys.stderr
+
+    def on_reject(number, line, error):
+        rejects.write(json.dumps({"line": number, "error": error, "input": line}) + "\n")
+
+    handle = sys.stdin if args.path == "-" else open(args.path, newline="", encoding="utf-8")
+    try:
+        stats = replay.run_replay(db, handle, user_id, args.batch_size, args.max_delay, on_reject)
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+        if rejects is not sys.stderr:
+            rejects.close()
+    emit(args, ("metric", "value"), stats.items())
+    return 0 if stats["rejected"] == 0 else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Project-LMS command line. Run without arguments for the interactive menu.")
+    parser.add_argument("--db", default="db/inventory.db", help="database file (default: db/inventory.db)")
+    parser.add_argument("--server", default=os.environ.get("LMS_SERVER"),
+                        help="use a server.py instance, e.g. http://lab-pc:8765, instead of --db (default: $LMS_SERVER)")
+    parser.add_argument("--user", default=os.environ.get("LMS_USER"), help="username (default: $LMS_USER)")
+    parser.add_argument("--password", default=os.environ.get("LMS_PASSWORD"),
+                        help="password (default: $LMS_PASSWORD, otherwise prompted)")
+    parser.add_argument("--format", choices=WRITERS, default=None,
+                        help="output format (default: table on a terminal, jsonl otherwise)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    tools = sub.add_parser("tools", help="list or add tools").add_subparsers(dest="tools_command", required=True)
+    list_ = tools.add_parser("list", help="stream tools, optionally filtered")
+    list_.add_argument("--status")
+    list_.add_argument("--category")
+    list_.add_argument("--condition")
+    list_.add_argument("--name-prefix")
+    list_.add_argument("--page-size", type=int, default=1000)
+    list_.set_defaults(handler=cmd_tools_list)
+    add = tools.add_parser("add", help="add a tool")
+    add.add_argument("name")
+    add.add_argument("category")
+    add.add_argument("condition", help="Good, Fair or Poor")
+    add.add_argument("quantity", type=int)
+    add.add_argument("location")
+    add.set_defaults(handler=cmd_tools_add)
+
+    today = datetime.date.today().isoformat()
+    borrow = sub.add_parser("borrow", help="borrow a tool as the logged-in user")
+    borrow.add_argument("tool_id", type=int)
+    borrow.add_argument("--borrower", help="borrower name (default: the username)")
+    borrow.add_argument("--date", default=today)
+    borrow.set_defaults(handler=cmd_borrow)
+
+    return_ = sub.add_parser("return", help="return a borrowed tool")
+    return_.add_argument("tool_id", type=int)
+    return_.add_argument("--date", default=today)
+    return_.set_defaults(handler=cmd_return)
+
+    search = sub.add_parser("search", help="full-text search over tools")
+    search.add_argument("keyword")
+    search.add_argument("--limit", type=int, default=50)
+    search.set_defaults(handler=cmd_search)
+
+    tx = sub.add_parser("tx", help="transactions").add_subparsers(dest="tx_command", required=True)
+    tx_list = tx.add_parser("list", help="stream transactions")
+    tx_list.add_argument("--since", help="only transactions on or after this date (YYYY-MM-DD)")
+    tx_list.add_argument("--tool", type=int, help="only this tool id")
+    tx_list.add_argument("--user-id", type=int, help="only this user id")
+    tx_list.set_defaults(handler=cmd_tx_list)
+
+    replay = sub.add_parser("replay", help="apply a stream of borrow/return/add operations in batches")
+    replay.add_argument("path", nargs="?", default="-", help="CSV or JSONL operations file (default: stdin)")
+    replay.add_argument("--batch-size", type=int, default=500, help="operations per transaction (default: 500)")
+    replay.add_argument("--max-delay", type=float, default=0.25,
+                        help="commit a partial batch after this many seconds (default: 0.25)")
+    replay.add_argument("--rejects", help="write rejected lines here as JSONL (default: stderr)")
+    replay.set_defaults(handler=cmd_replay)
+    return parser
+
+
+def authenticate(db, args):
+    """Return the user id for --user/--password (prompting for a missing password), or None."""
+    if not args.user:
+        return None
+    password = args.password
+    if password is None and sys.stdin.isatty():
+        password = getpass.getpass("Password: ")
+    user = db.get_user(args.user, password or "")
+    return user[0][0] if user else None
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        run_interactive("db/inventory.db")
+        return 0
+
+    args = build_parser().parse_args(argv)
+    deinit()  # plain stdout: no colour translation on streamed output
+    logging.getLogger("database").setLevel(logging.WARNING)
+    if args.format is None:
+        args.format = "table" if sys.stdout.isatty() else "jsonl"
+
+    db = RemoteDatabase(args.server) if args.server else DatabaseManager(args.db)
+    try:
+        user_id = authenticate(db, args)
+        if user_id is None:
+            print("Login failed: give --user and --password (or set LMS_USER / LMS_PASSWORD).", file=sys.stderr)
+            return 1
+        return args.handler(db, args, user_id)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)  # e.g. --server is unreachable
+        return 1
+    except BrokenPipeError:
+        # Output was cut short (e.g. piped into head); silence the flush at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
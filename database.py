@@ -1,88 +1,747 @@
+import os
+import re
 import sqlite3
-from contextlib import closing
+import queue
+import sys
+import threading
+import time
+from itertools import islice
+from collections import OrderedDict, namedtuple
+from contextlib import closing, contextmanager
 import logging
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+class _BatchConflict(Exception):
+    """Raised inside an all-or-nothing batch to roll it back."""
+
+
+class ReaderPool:
+    """Hands out a bounded number of read-only connections, one per thread at a time."""
+
+    def __init__(self, factory, size):
+        self._factory = factory
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self.size = size
+
+    @contextmanager
+    def connection(self):
+        """Borrow a reader connection; nested calls on the same thread reuse it."""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._factory()
+                with self._lock:
+                    self._connections.append(conn)
+            self._local.conn = conn
+            try:
+                yield conn
+            finally:
+                self._local.conn = None
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close every reader connection the pool has opened."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._idle = queue.LifoQueue()
+
+
+class QueryCache:
+    """LRU cache of read results, valid only for the generation they were read in."""
+
+    def __init__(self, max_entries=256, max_bytes=8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_size(rows):
+        size = sys.getsizeof(rows)
+        for row in rows:
+            size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+        return size
+
+    def get(self, key, generation):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != generation:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, generation, rows):
+        size = self.estimate_size(rows)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[2]
+            self._entries[key] = (generation, rows, size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries),
+                    "bytes": self.bytes, "max_entries": self.max_entries, "max_bytes": self.max_bytes}
+
+
+def _create_tools_fts(conn):
+    """Full-text index over tools(name, category, location), kept in sync by triggers."""
+    try:
+        conn.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS tools_fts USING fts5(
+            name, category, location, content='tools', content_rowid='tool_id', prefix='2 3'
+        )""")
+    except sqlite3.OperationalError as e:
+        logger.warning(f"FTS5 unavailable, search will fall back to LIKE: {e}")
+        return
+    for statement in (
+        """CREATE TRIGGER IF NOT EXISTS tools_fts_ai AFTER INSERT ON tools BEGIN
+            INSERT INTO tools_fts(rowid, name, category, location)
+            VALUES (new.tool_id, new.name, new.category, new.location);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS tools_fts_ad AFTER DELETE ON tools BEGIN
+            INSERT INTO tools_fts(tools_fts, rowid, name, category, location)
+            VALUES ('delete', old.tool_id, old.name, old.category, old.location);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS tools_fts_au AFTER UPDATE OF name, category, location ON tools BEGIN
+            INSERT INTO tools_fts(tools_fts, rowid, name, category, location)
+            VALUES ('delete', old.tool_id, old.name, old.category, old.location);
+            INSERT INTO tools_fts(rowid, name, category, location)
+            VALUES (new.tool_id, new.name, new.category, new.location);
+        END""",
+        "INSERT INTO tools_fts(tools_fts) VALUES ('rebuild')",
+    ):
+        conn.execute(statement)
+
+
+# Dimensions kept in tool_summary: dimension name -> tools column.
+SUMMARY_DIMENSIONS = {"category": "category", "status": "status", "location": "location"}
+
+
+def _create_tool_summary(conn):
+    """Per-category/status/location counts and quantities, maintained incrementally by triggers."""
+    conn.execute("""CREATE TABLE IF NOT EXISTS tool_summary (
+        dimension TEXT NOT NULL,
+        key TEXT NOT NULL,
+        tool_count INTEGER NOT NULL DEFAULT 0,
+        quantity INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (dimension, key)
+    ) WITHOUT ROWID""")
+
+    def add(row, sign):
+        return "\n".join(
+            f"""INSERT INTO tool_summary (dimension, key, tool_count, quantity)
+                VALUES ('{dimension}', IFNULL({row}.{column}, ''), {sign}1, {sign}IFNULL({row}.quantity, 0))
+                ON CONFLICT (dimension, key) DO UPDATE SET
+                    tool_count = tool_count + excluded.tool_count, quantity = quantity + excluded.quantity;"""
+            for dimension, column in SUMMARY_DIMENSIONS.items())
+
+    prune = "DELETE FROM tool_summary WHERE tool_count <= 0;"
+    watched = ", ".join(sorted(set(SUMMARY_DIMENSIONS.values()) | {"quantity"}))
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS tool_summary_ai AFTER INSERT ON tools BEGIN {add('new', '+')} END")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS tool_summary_ad AFTER DELETE ON tools BEGIN {add('old', '-')} {prune} END")
+    conn.execute(f"""CREATE TRIGGER IF NOT EXISTS tool_summary_au AFTER UPDATE OF {watched} ON tools BEGIN
+        {add('old', '-')} {add('new', '+')} {prune}
+    END""")
+    conn.execute("DELETE FROM tool_summary")
+    for dimension, column in SUMMARY_DIMENSIONS.items():
+        conn.execute(f"""INSERT INTO tool_summary (dimension, key, tool_count, quantity)
+                         SELECT '{dimension}', IFNULL({column}, ''), COUNT(*), IFNULL(SUM(quantity), 0)
+                         FROM tools GROUP BY IFNULL({column}, '')""")
+
+
+# Columns whose changes bump a tool's row_version (everything but the version bookkeeping).
+TRACKED_TOOL_COLUMNS = ("name", "category", "condition", "quantity", "location", "status",
+                        "borrower", "borrow_date", "user_id")
+
+
+def _create_change_tracking(conn):
+    """Give every tool change a monotonically increasing row_version, logged in tool_changes."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(tools)")}
+    if "row_version" not in existing:
+        conn.execute("ALTER TABLE tools ADD COLUMN row_version INTEGER NOT NULL DEFAULT 0")
+    if "updated_at" not in existing:
+        conn.execute("ALTER TABLE tools ADD COLUMN updated_at TEXT")
+    conn.execute("""CREATE TABLE IF NOT EXISTS change_counter (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    )""")
+    conn.execute("INSERT OR IGNORE INTO change_counter (id, version) VALUES (1, 0)")
+    conn.execute("""CREATE TABLE IF NOT EXISTS tool_changes (
+        tool_id INTEGER PRIMARY KEY,
+        row_version INTEGER NOT NULL,
+        deleted INTEGER NOT NULL DEFAULT 0
+    )""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tool_changes_version ON tool_changes(row_version)")
+
+    bump = "UPDATE change_counter SET version = version + 1 WHERE id = 1;"
+    current = "(SELECT version FROM change_counter WHERE id = 1)"
+
+    def touch(row):
+        return f"""UPDATE tools SET row_version = {current}, updated_at = CURRENT_TIMESTAMP
+                   WHERE tool_id = {row}.tool_id;"""
+
+    def log(row, deleted):
+        return f"""INSERT INTO tool_changes (tool_id, row_version, deleted) VALUES ({row}.tool_id, {current}, {deleted})
+                   ON CONFLICT (tool_id) DO UPDATE SET row_version = excluded.row_version, deleted = excluded.deleted;"""
+
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS tool_version_ai AFTER INSERT ON tools BEGIN "
+                 f"{bump} {touch('new')} {log('new', 0)} END")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS tool_version_au AFTER UPDATE OF {', '.join(TRACKED_TOOL_COLUMNS)} "
+                 f"ON tools BEGIN {bump} {touch('new')} {log('new', 0)} END")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS tool_version_ad AFTER DELETE ON tools BEGIN "
+                 f"{bump} {log('old', 1)} END")
+
+
+# Ordered schema migrations keyed on PRAGMA user_version. Each step is
+# (version, description, statements); a statement is either SQL or a callable
+# taking the connection. Steps must be idempotent so a step interrupted before
+# its version was recorded can simply run again.
+MIGRATIONS = [
+    (1, "base tables", [
+        """CREATE TABLE IF NOT EXISTS tools (
+            tool_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            category TEXT NOT NULL,
+            condition TEXT DEFAULT 'Good',
+            quantity INTEGER NOT NULL,
+            location TEXT,
+            status TEXT DEFAULT 'available',
+            borrower TEXT,
+            borrow_date TEXT,
+            user_id INTEGER,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        );""",
+        """CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE,
+            password TEXT NOT NULL,
+            name TEXT,
+            age INTEGER,
+            email TEXT
+        );""",
+        """CREATE TABLE IF NOT EXISTS students (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            progress INTEGER,
+            working_hours INTEGER
+        );""",
+        """CREATE TABLE IF NOT EXISTS transactions (
+            transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tool_id INTEGER,
+            user_id INTEGER,
+            transaction_type TEXT NOT NULL,
+            transaction_date TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(tool_id) REFERENCES tools(tool_id),
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        );""",
+    ]),
+    (2, "indexes for name, status and transaction lookups", [
+        "CREATE INDEX IF NOT EXISTS idx_tools_name ON tools(name)",
+        "CREATE INDEX IF NOT EXISTS idx_tools_status_user ON tools(status, user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_tools_category ON tools(category)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_tool_date ON transactions(tool_id, transaction_date)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_user_date ON transactions(user_id, transaction_date)",
+    ]),
+    (3, "full-text search over tool name, category and location", [_create_tools_fts]),
+    (4, "trigger-maintained summary table for dashboard aggregates", [_create_tool_summary]),
+    (5, "row versions and a change log for incremental refresh", [_create_change_tracking]),
+    (6, "indexes backing the sortable inventory columns", [
+        "CREATE INDEX IF NOT EXISTS idx_tools_condition ON tools(condition)",
+        "CREATE INDEX IF NOT EXISTS idx_tools_quantity ON tools(quantity)",
+        "CREATE INDEX IF NOT EXISTS idx_tools_status ON tools(status)",
+    ]),
+    (7, "case-insensitive name index for prefix filtering", [
+        "CREATE INDEX IF NOT EXISTS idx_tools_name_nocase ON tools(name COLLATE NOCASE)",
+    ]),
+    (8, "transaction date index for archiving and date-range history", [
+        "CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(transaction_date)",
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+TOOL_CONDITIONS = ("Good", "Fair", "Poor")
+TRANSACTION_TYPES = ("borrow", "return")
+REPLAY_OPERATIONS = ("borrow", "return", "add")
+# Record fields for each apply_operations op, in args order (the inverse of validate_operation)
+OPERATION_FIELDS = {
+    "borrow": ("tool_id", "user_id", "borrower", "date"),
+    "return": ("tool_id", "user_id", "date"),
+    "add": ("name", "category", "condition", "quantity", "location", "status"),
+}
+
+
+def _required(row, key):
+    value = row.get(key)
+    if value is None or str(value).strip() == "":
+        raise ValueError(f"Missing required field '{key}'.")
+    return str(value).strip()
+
+
+def _as_int(value, key, allow_none=False):
+    if value is None or str(value).strip() == "":
+        if allow_none:
+            return None
+        raise ValueError(f"Missing required field '{key}'.")
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        raise ValueError(f"Field '{key}' must be an integer, got {value!r}.")
+
+
+def validate_tool_row(row):
+    """Turn an import record into a tools row tuple, raising ValueError if invalid."""
+    condition = _required(row, "condition").capitalize()
+    if condition not in TOOL_CONDITIONS:
+        raise ValueError(f"Condition must be one of {', '.join(TOOL_CONDITIONS)}, got {condition!r}.")
+    quantity = _as_int(row.get("quantity"), "quantity")
+    if quantity < 0:
+        raise ValueError("Quantity cannot be negative.")
+    location = row.get("location")
+    return (_required(row, "name"), _required(row, "category"), condition, quantity,
+            str(location).strip() if location is not None else None, "available")
+
+
+def validate_transaction_row(row):
+    """Turn an import record into a transactions row tuple, raising ValueError if invalid."""
+    transaction_type = _required(row, "transaction_type").lower()
+    if transaction_type not in TRANSACTION_TYPES:
+        raise ValueError(f"transaction_type must be 'borrow' or 'return', got {transaction_type!r}.")
+    return (_as_int(row.get("tool_id"), "tool_id"), _as_int(row.get("user_id"), "user_id", allow_none=True),
+            transaction_type, _required(row, "transaction_date"))
+
+
+def validate_operation(record, user_id, now):
+    """Turn a replay record into (op, args) for apply_operations, raising ValueError if invalid.
+
+    user_id and now fill in a borrow/return record without user_id or date.
+    """
+    op = str(record.get("op", "")).lower()
+    if op not in REPLAY_OPERATIONS:
+        raise ValueError(f"Operation must be one of {', '.join(REPLAY_OPERATIONS)}, got {op!r}.")
+    if op == "add":
+        return op, validate_tool_row(record)
+    tool_id = _as_int(record.get("tool_id"), "tool_id")
+    user = _as_int(record.get("user_id"), "user_id", allow_none=True) or user_id
+    date = record.get("date") or now
+    if not isinstance(date, str):
+        raise ValueError(f"Field 'date' must be a date string, got {date!r}.")
+    if op == "borrow":
+        return op, (tool_id, user, _required(record, "borrower"), date)
+    return op, (tool_id, user, date)
+
+
+BORROW_UPDATE = """
+    UPDATE tools SET 
+        quantity = quantity - 1,
+        status = CASE WHEN quantity - 1 = 0 THEN 'unavailable' ELSE 'available' END,
+        user_id = ?, borrower = ?, borrow_date = ? 
+    WHERE tool_id = ? AND quantity > 0
+"""
+BORROW_INSERT = """
+    INSERT INTO transactions (tool_id, user_id, transaction_type, transaction_date)
+    VALUES (?, ?, 'borrow', ?)
+"""
+RETURN_UPDATE = """UPDATE tools SET status = 'available', borrower = NULL, borrow_date = NULL, user_id = NULL
+                   WHERE tool_id = ? AND borrower IS NOT NULL"""
+RETURN_INSERT = """
+    INSERT INTO transactions (tool_id, user_id, transaction_type, transaction_date)
+    VALUES (?, ?, 'return', ?)
+"""
+
+
+def _apply_operation(cursor, op, args):
+    """Run one replay operation on cursor, raising ValueError if it cannot apply."""
+    if op == "borrow":
+        tool_id, user_id, borrower, date = args
+        cursor.execute(BORROW_UPDATE, (user_id, borrower, date, tool_id))
+        if cursor.rowcount == 0:
+            raise ValueError("Tool is unavailable or quantity is insufficient.")
+        cursor.execute(BORROW_INSERT, (tool_id, user_id, date))
+    elif op == "return":
+        tool_id, user_id, date = args
+        cursor.execute(RETURN_UPDATE, (tool_id,))
+        if cursor.rowcount == 0:
+            raise ValueError("Tool is not currently borrowed.")
+        cursor.execute(RETURN_INSERT, (tool_id, user_id, date))
+    elif op == "add":
+        cursor.execute(BULK_IMPORTS["tools"][0], args)
+    else:
+        raise ValueError(f"Unknown operation '{op}'.")
+
+
+# Per-item outcome of borrow_many/return_many; index is the item's position in the batch.
+BatchResult = namedtuple("BatchResult", ["index", "ok", "error"])
+BATCH_POLICIES = ("all_or_nothing", "best_effort")
+
+TOOL_COLUMNS = ("tool_id", "name", "category", "condition", "quantity", "location",
+                "status", "borrower", "borrow_date", "user_id", "row_version", "updated_at")
+
+
+def _check_columns(columns):
+    for column in columns:
+        if column not in TOOL_COLUMNS:
+            raise ValueError(f"Unknown tools column '{column}'.")
+
+
+def _where_clause(where):
+    """Build (sql, params) from a {column: value} dict or an (sql, params) pair."""
+    if not where:
+        return [], []
+    if isinstance(where, dict):
+        _check_columns(where)
+        clauses, params = [], []
+        for column, value in where.items():
+            if value is None:
+                clauses.append(f"{column} IS NULL")
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return clauses, params
+    sql, params = where
+    return [f"({sql})"], list(params)
+
+
+def _keyset_segments(order_by, descending, after):
+    """Predicates selecting the rows strictly after the (order value, tool_id) key.
+
+    Returns [(sql, params), ...] covering disjoint runs of rows in sort order,
+    to be read one after another: the rest of the current value's run, then
+    the values after it. SQLite sorts NULLs first ascending and last
+    descending, so a nullable column needs a separate run for its NULLs.
+    Each run is an equality plus one range, or a single range, so SQLite
+    seeks straight to the key in the (column, tool_id) index; a row value
+    such as (column, tool_id) > (?, ?) is only searched on column and scans
+    every row sharing the current value.
+    """
+    value, tool_id = after
+    if order_by == "tool_id":
+        return [("tool_id < ?" if descending else "tool_id > ?", [tool_id])]
+    if descending:
+        if value is None:
+            return [(f"{order_by} IS NULL AND tool_id < ?", [tool_id])]
+        return [(f"{order_by} = ? AND tool_id < ?", [value, tool_id]), (f"{order_by} < ?", [value]),
+                (f"{order_by} IS NULL", [])]
+    if value is None:
+        return [(f"{order_by} IS NULL AND tool_id > ?", [tool_id]), (f"{order_by} IS NOT NULL", [])]
+    return [(f"{order_by} = ? AND tool_id > ?", [value, tool_id]), (f"{order_by} > ?", [value])]
+
+
+def _read_changes(conn, version, max_changes):
+    """(latest, changed_ids, deleted_ids) from the change log; call inside a read transaction."""
+    latest = conn.execute("SELECT version FROM change_counter WHERE id = 1").fetchone()[0]
+    changes = conn.execute("SELECT tool_id, deleted FROM tool_changes WHERE row_version > ? "
+                           "ORDER BY row_version", (version,)).fetchall()
+    if max_changes is not None and len(changes) > max_changes:
+        return latest, None, None
+    return (latest, [tool_id for tool_id, gone in changes if not gone],
+            [tool_id for tool_id, gone in changes if gone])
+
+
+def _first_transaction_since(conn, table, since):
+    """Lowest transaction_id in table dated on or after since, or None.
+
+    MIN(transaction_id) walks the rowids up from the oldest row until one
+    matches, which costs the rows before since; MIN(+transaction_id) reads
+    idx_transactions_date from since onwards, which costs the rows after
+    it. One index seek tells roughly where since falls by id, and the
+    cheaper of the two is used.
+    """
+    row = conn.execute(f"SELECT transaction_id FROM {table} WHERE transaction_date >= ? "
+                       f"ORDER BY transaction_date LIMIT 1", (since,)).fetchone()
+    if row is None:
+        return None
+    low, high = _id_range(conn, table)
+    column = "transaction_id" if row[0] - low < high - row[0] else "+transaction_id"
+    return conn.execute(f"SELECT MIN({column}) FROM {table} WHERE transaction_date >= ?", (since,)).fetchone()[0]
+
+
+def _id_range(conn, table, key="transaction_id"):
+    """(MIN, MAX) of table's rowid key, as two rowid lookups (a combined MIN/MAX would scan)."""
+    return conn.execute(f"SELECT (SELECT MIN({key}) FROM {table}), (SELECT MAX({key}) FROM {table})").fetchone()
+
+
+BULK_IMPORTS = {
+    "tools": ("INSERT INTO tools (name, category, condition, quantity, location, status) VALUES (?, ?, ?, ?, ?, ?)",
+              validate_tool_row),
+    "transactions": ("INSERT INTO transactions (tool_id, user_id, transaction_type, transaction_date) VALUES (?, ?, ?, ?)",
+                     validate_transaction_row),
+}
+
+# Transactions older than an archive cutoff live in one database per year,
+# <db dir>/archive/<db name>_transactions_<year>.db. Readers see them together
+# with the live table through the TEMP view transactions_history.
+HISTORY_VIEW = "transactions_history"
+HISTORY_COLUMNS = "transaction_id, tool_id, user_id, transaction_type, transaction_date"
+ARCHIVE_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS {schema}.transactions (
+        transaction_id INTEGER PRIMARY KEY,
+        tool_id INTEGER,
+        user_id INTEGER,
+        transaction_type TEXT NOT NULL,
+        transaction_date TEXT
+    )""",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_transactions_tool_date ON transactions(tool_id, transaction_date)",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_transactions_user_date ON transactions(user_id, transaction_date)",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_transactions_date ON transactions(transaction_date)",
+]
+
+
+def _history_view_sql(schemas):
+    arms = [f"SELECT {HISTORY_COLUMNS} FROM main.transactions"]
+    arms += [f"SELECT {HISTORY_COLUMNS} FROM {schema}.transactions" for schema in schemas]
+    return f"CREATE TEMP VIEW {HISTORY_VIEW} AS " + " UNION ALL ".join(arms)
+
+
+# What iter_export reads: rows come out in key order (the resume point of an
+# interrupted export), filters are {name: SQL condition with one ?}.
+Export = namedtuple("Export", ["table", "key", "columns", "query", "filters"])
+
+EXPORTS = {
+    "transactions": Export(
+        HISTORY_VIEW, "x.transaction_id",
+        ("transaction_id", "transaction_date", "transaction_type", "tool_id", "tool_name", "category",
+         "condition", "location", "user_id", "username", "user_name"),
+        """SELECT x.transaction_id, x.transaction_date, x.transaction_type, x.tool_id, t.name, t.category,
+                  t.condition, t.location, x.user_id, u.username, u.name
+           FROM transactions_history x
+           LEFT JOIN tools t ON t.tool_id = x.tool_id
+           LEFT JOIN users u ON u.id = x.user_id""",
+        {"since": "x.transaction_date >= ?", "until": "x.transaction_date < date(?, '+1 day')",
+         "type": "x.transaction_type = ?", "tool_id": "x.tool_id = ?", "user_id": "x.user_id = ?",
+         "category": "t.category = ?"},
+    ),
+    "tools": Export(
+        "tools", "tool_id",
+        ("tool_id", "name", "category", "condition", "quantity", "location", "status", "borrower",
+         "borrow_date", "user_id", "updated_at"),
+        """SELECT tool_id, name, category, condition, quantity, location, status, borrower,
+                  borrow_date, user_id, updated_at
+           FROM tools""",
+        {"category": "category = ?", "condition": "condition = ?", "status": "status = ?",
+         "location": "location = ?"},
+    ),
+}
+
+
 class DatabaseManager:
-    def __init__(self, db_path):
+    def __init__(self, db_path, pool_size=0, journal_mode="WAL", synchronous="NORMAL",
+                 cache_size=-8000, mmap_size=0, busy_timeout=5.0,
+                 query_cache_entries=0, query_cache_bytes=8 * 1024 * 1024, auto_vacuum="INCREMENTAL"):
+        """Open the database.
+
+        pool_size > 0 enables pooled mode: the main connection becomes the single
+        writer and reads are served by up to pool_size reader connections, so
+        several threads can read while a borrow/return is being written.
+        cache_size follows SQLite's convention (negative values are KiB).
+
+        query_cache_entries > 0 turns on the read-through result cache. Every
+        write bumps a generation counter that invalidates it, and commits made
+        by other processes are picked up through PRAGMA data_version.
+
+        auto_vacuum only takes effect on a new database file (or after a
+        full VACUUM); INCREMENTAL lets archive_transactions hand freed
+        pages back to the filesystem a few at a time.
+        """
         self.db_path = db_path
+        self.pool_size = pool_size
+        self.journal_mode = journal_mode
+        self.auto_vacuum = auto_vacuum
+        self.synchronous = synchronous
+        self.cache_size = cache_size
+        self.mmap_size = mmap_size
+        self.busy_timeout = busy_timeout
         self.conn = None
         self.cursor = None
+        self._pool = None
+        self._write_lock = threading.RLock()
+        self._generation = 0
+        self._query_cache = QueryCache(query_cache_entries, query_cache_bytes) if query_cache_entries > 0 else None
+        self._version_conn = None
+        self._version_lock = threading.Lock()
+        self._data_version = None
+        self._has_fts = None
         self.connect()
         self.create_tables()
 
+    @property
+    def is_memory(self):
+        return self.db_path == ":memory:" or str(self.db_path).startswith("file::memory:")
+
+    @property
+    def is_remote(self):
+        return False  # see remote_database.RemoteDatabase
+
+    def _open_connection(self, read_only=False):
+        """Open a connection with the configured pragmas applied."""
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False)
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA cache_size = {int(self.cache_size)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+
     def connect(self):
         """Establish or reconnect to the database."""
         try:
-            if not self.conn or self.conn.closed:
-                self.conn = sqlite3.connect(self.db_path)
+            if self.conn is None:
+                self.conn = self._open_connection()
                 self.cursor = self.conn.cursor()
+                if self.auto_vacuum and not self.is_memory:
+                    # Must come before journal_mode, which writes the header of a new file
+                    self.conn.execute(f"PRAGMA auto_vacuum = {self.auto_vacuum}")
+                if self.journal_mode and not self.is_memory:
+                    mode = self.conn.execute(f"PRAGMA journal_mode = {self.journal_mode}").fetchone()[0]
+                    if mode.lower() != self.journal_mode.lower():
+                        logger.warning(f"Requested journal_mode {self.journal_mode}, got {mode}")
+                if self.pool_size > 0 and self._pool is None and not self.is_memory:
+                    self._pool = ReaderPool(lambda: self._open_connection(read_only=True), self.pool_size)
                 logger.info(f"Connected to database: {self.db_path}")
         except sqlite3.Error as e:
             logger.error(f"Failed to connect to database: {e}")
             raise
 
+    @contextmanager
+    def _writer(self):
+        """Serialize access to the writer connection across threads."""
+        with self._write_lock:
+            self.ensure_connection_open()
+            try:
+                yield self.conn
+            finally:
+                self._generation += 1
+
+    @contextmanager
+    def _reader(self):
+        """Yield a connection for read-only queries."""
+        if self._pool is not None:
+            with self._pool.connection() as conn:
+                yield conn
+        else:
+            with self._write_lock:
+                self.ensure_connection_open()
+                yield self.conn
+
+    @contextmanager
+    def transaction(self):
+        """Run a block as one BEGIN IMMEDIATE transaction on the writer connection."""
+        with self._writer() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+    def _current_generation(self):
+        """Return the write generation, bumping it if another process has committed."""
+        if not self.is_memory:
+            with self._version_lock:
+                if self._version_conn is None:
+                    self._version_conn = self._open_connection(read_only=True)
+                version = self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+                if version != self._data_version:
+                    if self._data_version is not None:
+                        self._generation += 1
+                    self._data_version = version
+        return self._generation
+
+    def cache_stats(self):
+        """Return hit/miss counters for the query cache, or None when it is off."""
+        if self._query_cache is None:
+            return None
+        stats = self._query_cache.stats()
+        stats["generation"] = self._generation
+        return stats
+
     def create_tables(self):
         """Create necessary tables if they don't exist."""
-        table_queries = [
-            """CREATE TABLE IF NOT EXISTS tools (
-                tool_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                category TEXT NOT NULL,
-                condition TEXT DEFAULT 'Good',
-                quantity INTEGER NOT NULL,
-                location TEXT,
-                status TEXT DEFAULT 'available',
-                borrower TEXT,
-                borrow_date TEXT,
-                user_id INTEGER,
-                FOREIGN KEY(user_id) REFERENCES users(id)
-            );""",
-            """CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL UNIQUE,
-                password TEXT NOT NULL,
-                name TEXT,
-                age INTEGER,
-                email TEXT
-            );""",
-            """CREATE TABLE IF NOT EXISTS students (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT,
-                progress INTEGER,
-                working_hours INTEGER
-            );""",
-            """CREATE TABLE IF NOT EXISTS transactions (
-                transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                tool_id INTEGER,
-                user_id INTEGER,
-                transaction_type TEXT NOT NULL,
-                transaction_date TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY(tool_id) REFERENCES tools(tool_id),
-                FOREIGN KEY(user_id) REFERENCES users(id)
-            );"""
-        ]
+        self.migrate()
+
+    def schema_version(self):
+        """Return the schema version recorded in the database."""
+        with self._reader() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate(self, target=SCHEMA_VERSION):
+        """Apply pending migrations up to target, one transaction per step."""
+        current = self.schema_version()
+        if current >= target:
+            return current
         try:
-            with closing(self.conn.cursor()) as cursor:
-                for query in table_queries:
-                    cursor.execute(query)
-                self.conn.commit()
-                logger.info("Tables created or already exist.")
+            for version, description, statements in MIGRATIONS:
+                if version <= current or version > target:
+                    continue
+                with self.transaction() as conn:
+                    for statement in statements:
+                        if callable(statement):
+                            statement(conn)
+                        else:
+                            conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version = {int(version)}")
+                current = version
+                logger.info(f"Applied migration {version}: {description}")
         except sqlite3.Error as e:
-            logger.error(f"Failed to create tables: {e}")
+            logger.error(f"Failed to migrate schema: {e}")
             raise
+        return current
 
     def _execute_query(self, query, params=None, fetch=False):
         """Helper function to execute queries with error handling."""
         try:
-            with closing(self.conn.cursor()) as cursor:
+            if fetch:
+                if self._query_cache is None:
+                    with self._reader() as conn, closing(conn.cursor()) as cursor:
+                        cursor.execute(query, params or [])
+                        return cursor.fetchall()
+                key = (query, tuple(params or ()))
+                generation = self._current_generation()
+                rows = self._query_cache.get(key, generation)
+                if rows is None:
+                    with self._reader() as conn, closing(conn.cursor()) as cursor:
+                        cursor.execute(query, params or [])
+                        rows = cursor.fetchall()
+                    self._query_cache.put(key, generation, rows)
+                return list(rows)
+            with self._writer() as conn, closing(conn.cursor()) as cursor:
                 cursor.execute(query, params or [])
-                if fetch:
-                    return cursor.fetchall()
-                self.conn.commit()
+                conn.commit()
         except sqlite3.IntegrityError as e:
             logger.error(f"Integrity error in query: {query}\n{e}")
             raise
@@ -96,30 +755,429 @@ class DatabaseManager:
             self.connect()
         try:
             # Check if the connection is still alive
-            self.conn.cursor().execute('SELECT 1')
+            self.conn.execute('SELECT 1')
         except sqlite3.ProgrammingError:
             # If cursor cannot be executed, the connection is closed, so we reconnect
+            self.conn = None
             self.connect()
 
     def delete_tool(self, tool_id):
         """Delete a tool from the database."""
-        self.ensure_connection_open()
-        try:
-            with closing(self.conn.cursor()) as cursor:
-                cursor.execute("DELETE FROM tools WHERE tool_id = ?", (tool_id,))
-                if cursor.rowcount == 0:
-                    raise ValueError(f"Tool with ID {tool_id} does not exist.")
-                self.conn.commit()
-                logger.info(f"Tool with ID {tool_id} deleted.")
-        except Exception as e:
-            logger.error(f"Error deleting tool with ID {tool_id}: {e}")
-            self.conn.rollback()
-            raise
+        with self._writer() as conn:
+            try:
+                with closing(conn.cursor()) as cursor:
+                    cursor.execute("DELETE FROM tools WHERE tool_id = ?", (tool_id,))
+                    if cursor.rowcount == 0:
+                        raise ValueError(f"Tool with ID {tool_id} does not exist.")
+                    conn.commit()
+                    logger.info(f"Tool with ID {tool_id} deleted.")
+            except Exception as e:
+                logger.error(f"Error deleting tool with ID {tool_id}: {e}")
+                conn.rollback()
+                raise
 
     def fetch_all_tools(self):
         """Fetch all tools."""
         return self._execute_query("SELECT * FROM tools", fetch=True)
 
+    def fetch_tools_page(self, columns=None, where=None, order_by="tool_id", descending=False,
+                         after=None, limit=500, offset=0):
+        """Fetch one keyset page of tools.
+
+        Returns (rows, next_key); pass next_key back as after to get the
+        following page. next_key is None once the last page has been read.
+        offset is only for jumping to an arbitrary position; sequential
+        paging should always use after.
+        """
+        columns = tuple(columns or TOOL_COLUMNS)
+        _check_columns(columns + (order_by,))
+        direction = "DESC" if descending else "ASC"
+        order = f"tool_id {direction}" if order_by == "tool_id" else f"{order_by} {direction}, tool_id {direction}"
+        segments = [(None, [])] if after is None else _keyset_segments(order_by, descending, after)
+        if offset and len(segments) > 1:
+            # An offset cannot be split across runs; read them as one predicate
+            segments = [(" OR ".join(f"({sql})" for sql, _ in segments), [p for _, ps in segments for p in ps])]
+        rows = []
+        for keyset, keyset_params in segments:
+            clauses, params = _where_clause(where)
+            if keyset:
+                clauses.append(keyset)
+                params.extend(keyset_params)
+            query = f"SELECT {', '.join(columns)}, {order_by}, tool_id FROM tools"
+            if clauses:
+                query += " WHERE " + " AND ".join(clauses)
+            query += f" ORDER BY {order} LIMIT ? OFFSET ?"
+            rows += self._execute_query(query, params + [limit - len(rows), offset], fetch=True)
+            if len(rows) == limit:
+                break
+        width = len(columns)
+        next_key = tuple(rows[-1][width:]) if rows and len(rows) == limit else None
+        return [row[:width] for row in rows], next_key
+
+    def iter_tools(self, columns=None, where=None, order_by="tool_id", descending=False, page_size=500):
+        """Yield tools page by page, selecting only the requested columns."""
+        after = None
+        while True:
+            rows, after = self.fetch_tools_page(columns, where, order_by, descending, after, page_size)
+            yield from rows
+            if after is None:
+                return
+
+    def filter_tools(self, condition=None, category=None, name_prefix=None, status=None,
+                     columns=None, after=None, limit=200):
+        """Fetch one page of tools matching all of the given filters, in tool_id order.
+
+        condition, category and status must match exactly; name_prefix
+        matches the start of the name case-insensitively (served by the
+        NOCASE name index). Returns (rows, next_key) like fetch_tools_page.
+        """
+        clauses, params = [], []
+        for column, value in (("condition", condition), ("category", category), ("status", status)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if name_prefix:
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            params.append(re.sub(r"([\\%_])", r"\\\1", name_prefix) + "%")
+        where = (" AND ".join(clauses), params) if clauses else None
+        return self.fetch_tools_page(columns, where, after=after, limit=limit)
+
+    def filter_options(self):
+        """Return {column: [values]} for the condition, category and status filters."""
+        conditions = [row[0] for row in self._execute_query(
+            "SELECT DISTINCT condition FROM tools WHERE condition IS NOT NULL ORDER BY condition", fetch=True)]
+        return {
+            "condition": sorted(set(conditions) | set(TOOL_CONDITIONS)),
+            "category": list(self.category_counts()),
+            "status": list(self.status_counts()),
+        }
+
+    def iter_transactions(self, since=None, tool_id=None, user_id=None, batch_size=1000, after=None):
+        """Yield transactions in transaction_id order straight from one cursor.
+
+        Rows are fetched batch_size at a time, so the first row is available
+        immediately and memory stays flat however many rows match. since is
+        compared with transaction_date (e.g. '2024-01-01'); after skips
+        transaction ids up to and including it. Archived years are included.
+        A reader connection is held until the generator is exhausted or closed.
+        """
+        with self._history_reader() as conn:
+            if since is not None:
+                # Start reading by id at the first transaction on or after since; ordering the view
+                # by id with only a date filter would walk all of history before since first
+                starts = [_first_transaction_since(conn, table, since) for table in self._history_tables(conn)]
+                starts = [start for start in starts if start is not None]
+                if not starts:
+                    return
+                after = min(starts) - 1 if after is None else max(after, min(starts) - 1)
+            clauses, params = [], []
+            for clause, value in (("transaction_date >= ?", since), ("tool_id = ?", tool_id),
+                                  ("user_id = ?", user_id), ("transaction_id > ?", after)):
+                if value is not None:
+                    clauses.append(clause)
+                    params.append(value)
+            query = f"SELECT {HISTORY_COLUMNS} FROM {HISTORY_VIEW}"
+            if clauses:
+                query += " WHERE " + " AND ".join(clauses)
+            query += " ORDER BY transaction_id"
+            with closing(conn.execute(query, params)) as cursor:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        return
+                    yield from rows
+
+    def fetch_transactions_page(self, since=None, tool_id=None, user_id=None, after=None, limit=1000):
+        """Return (rows, next_key) for one page of iter_transactions, for clients that page."""
+        rows = list(islice(self.iter_transactions(since, tool_id, user_id, batch_size=limit, after=after), limit))
+        return rows, (rows[-1][0] if rows and len(rows) == limit else None)
+
+    def iter_export(self, kind, filters=None, after=None, batch_size=1000):
+        """Yield the rows of an EXPORTS entry in key order straight from one cursor.
+
+        filters maps the export's filter names to values (None is ignored);
+        after skips rows whose key is not greater than it, which is how an
+        interrupted export resumes. Like iter_transactions, memory stays flat
+        and a reader connection is held until the generator is done.
+        """
+        if kind not in EXPORTS:
+            raise ValueError(f"Cannot export '{kind}'.")
+        export = EXPORTS[kind]
+        clauses, params = [], []
+        for name, value in (filters or {}).items():
+            if name not in export.filters:
+                raise ValueError(f"Unknown {kind} export filter '{name}'.")
+            if value is not None:
+                clauses.append(export.filters[name])
+                params.append(value)
+        if after is not None:
+            clauses.append(f"{export.key} > ?")
+            params.append(after)
+        query = export.query
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += f" ORDER BY {export.key}"
+        with (self._history_reader() if export.table == HISTORY_VIEW else self._reader()) as conn:
+            with closing(conn.execute(query, params)) as cursor:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        return
+                    yield from rows
+
+    def export_key_range(self, kind):
+        """Return (lowest, highest) key of an export's base table, for progress estimates."""
+        export = EXPORTS[kind]
+        if export.table != HISTORY_VIEW:
+            with self._reader() as conn:
+                return _id_range(conn, export.table, export.columns[0])
+        # Over the view MIN/MAX would scan every table; each table's own range is two lookups
+        with self._history_reader() as conn:
+            ranges = [_id_range(conn, table) for table in self._history_tables(conn)]
+        lows = [low for low, _ in ranges if low is not None]
+        highs = [high for _, high in ranges if high is not None]
+        return (min(lows), max(highs)) if lows else (None, None)
+
+    def archive_path(self, year):
+        """Return the file holding the transactions archived for year."""
+        directory, name = os.path.split(os.path.abspath(self.db_path))
+        return os.path.join(directory, "archive", f"{os.path.splitext(name)[0]}_transactions_{int(year)}.db")
+
+    def archive_years(self):
+        """Return the years that have an archive database, oldest first."""
+        if self.is_memory:
+            return []
+        directory = os.path.dirname(self.archive_path(2000))
+        pattern = re.compile(re.escape(os.path.basename(self.archive_path(2000))).replace("2000", r"(\d{4})") + "$")
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        return sorted(int(match.group(1)) for match in map(pattern.match, names) if match)
+
+    def ensure_history_view(self, conn):
+        """Attach the archive databases to conn and (re)create its TEMP transactions_history view.
+
+        Cheap when nothing changed, so it is called before every history
+        read; a connection opened before an archive run picks up the new
+        years on its next read. SQLite attaches at most 10 databases per
+        connection, so only the newest years are included beyond that.
+        """
+        years = self.archive_years()
+        limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        if len(years) > limit:
+            logger.warning(f"{len(years)} archive years but only {limit} can be attached; "
+                           f"history before {years[-limit]} is left out")
+            years = years[-limit:]
+        schemas = [f"archive_{year}" for year in years]
+        sql = _history_view_sql(schemas)
+        attached = {entry[1] for entry in conn.execute("PRAGMA database_list")}
+        row = conn.execute("SELECT sql FROM temp.sqlite_master WHERE type = 'view' AND name = ?",
+                           (HISTORY_VIEW,)).fetchone()
+        if row and row[0].split(" AS ", 1)[-1] == sql.split(" AS ", 1)[-1] and attached.issuperset(schemas):
+            return
+        query_only = conn.execute("PRAGMA query_only").fetchone()[0]
+        conn.execute("PRAGMA query_only = OFF")  # creating a TEMP view counts as a write
+        try:
+            for schema in [name for name in attached if name.startswith("archive_") and name not in schemas]:
+                conn.execute(f"DETACH DATABASE {schema}")
+            for year, schema in zip(years, schemas):
+                if schema not in attached:
+                    conn.execute(f"ATTACH DATABASE ? AS {schema}", (self.archive_path(year),))
+            conn.execute(f"DROP VIEW IF EXISTS temp.{HISTORY_VIEW}")
+            conn.execute(sql)
+        finally:
+            conn.execute(f"PRAGMA query_only = {int(query_only)}")
+
+    def _history_tables(self, conn):
+        """The transactions tables behind conn's transactions_history: main, then each attached archive."""
+        return ["main.transactions"] + [f"{entry[1]}.transactions" for entry in conn.execute("PRAGMA database_list")
+                                        if entry[1].startswith("archive_")]
+
+    @contextmanager
+    def _history_reader(self):
+        """A reader connection with transactions_history up to date."""
+        with self._reader() as conn:
+            self.ensure_history_view(conn)
+            yield conn
+
+    def archive_transactions(self, cutoff, batch_size=500, pause=0.05, progress=None):
+        """Move transactions dated before cutoff into the per-year archive databases.
+
+        Each batch is one short transaction that copies up to batch_size
+        rows into the archive and deletes them from the live table, and the
+        writer is released for pause seconds between batches, so borrowing
+        and returning carry on while years of history are moved. Copies use
+        INSERT OR IGNORE, so a run interrupted between the two databases'
+        commits can simply be repeated. progress(year, moved) is called after
+        every batch. Returns {year: rows moved}.
+        """
+        moved = {}
+        select = ("SELECT transaction_id FROM main.transactions WHERE transaction_date >= ? AND transaction_date < ? "
+                  "ORDER BY transaction_date, transaction_id LIMIT ?")
+        while True:
+            with self._reader() as conn:
+                oldest = conn.execute("SELECT MIN(transaction_date) FROM transactions WHERE transaction_date < ?",
+                                      (cutoff,)).fetchone()[0]
+            if oldest is None:
+                break
+            if not re.match(r"\d{4}-", oldest):
+                logger.warning(f"Stopped archiving at transaction_date {oldest!r}, which does not start with a year")
+                break
+            year = int(oldest[:4])
+            start, end = f"{year:04d}-01-01", min(cutoff, f"{year + 1:04d}-01-01")
+            schema = f"archive_{year}"
+            with self._writer() as conn:
+                if schema not in {entry[1] for entry in conn.execute("PRAGMA database_list")}:
+                    os.makedirs(os.path.dirname(self.archive_path(year)), exist_ok=True)
+                    conn.execute(f"ATTACH DATABASE ? AS {schema}", (self.archive_path(year),))
+                    conn.execute(f"PRAGMA {schema}.journal_mode = WAL")
+                    for statement in ARCHIVE_SCHEMA:
+                        conn.execute(statement.format(schema=schema))
+                    conn.commit()
+            while True:
+                with self.transaction() as conn:
+                    conn.execute(f"INSERT OR IGNORE INTO {schema}.transactions ({HISTORY_COLUMNS}) "
+                                 f"SELECT {HISTORY_COLUMNS} FROM main.transactions WHERE transaction_id IN ({select})",
+                                 (start, end, batch_size))
+                    count = conn.execute(f"DELETE FROM main.transactions WHERE transaction_id IN ({select})",
+                                         (start, end, batch_size)).rowcount
+                moved[year] = moved.get(year, 0) + count
+                if progress:
+                    progress(year, moved[year])
+                if count < batch_size:
+                    break
+                time.sleep(pause)
+            with self._writer() as conn:
+                conn.execute(f"DETACH DATABASE {schema}")
+            logger.info(f"Archived {moved.get(year, 0)} transactions from {year} to {self.archive_path(year)}")
+        return moved
+
+    def incremental_vacuum(self, pages_per_step=1024, pause=0.05):
+        """Return free pages to the filesystem a few at a time; returns the pages freed.
+
+        Only works when the file uses auto_vacuum = INCREMENTAL (new
+        databases do; see enable_incremental_vacuum for older ones).
+        """
+        with self._reader() as conn:
+            mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode != 2:
+            return 0
+        freed = 0
+        while True:
+            with self._writer() as conn:
+                free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if free == 0:
+                    break
+                # execute() would step this pragma once and free a single page; executescript runs it to the end
+                conn.executescript(f"PRAGMA incremental_vacuum({int(pages_per_step)});")
+                freed += free - conn.execute("PRAGMA freelist_count").fetchone()[0]
+            time.sleep(pause)
+        with self._writer() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()  # lets the file actually shrink
+        return freed
+
+    def enable_incremental_vacuum(self):
+        """Switch an existing file to auto_vacuum = INCREMENTAL. Rewrites the whole database once."""
+        with self._writer() as conn:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+
+    def has_fts(self):
+        """Return True if the tools_fts index exists in this database."""
+        if self._has_fts is None:
+            rows = self._execute_query("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tools_fts'",
+                                       fetch=True)
+            self._has_fts = bool(rows)
+        return self._has_fts
+
+    def search_tool(self, keyword, limit=50, offset=0):
+        """Search tools by name, category or location.
+
+        Every word in keyword is matched as a prefix and results are ranked
+        with bm25, weighting name above category above location.
+        """
+        terms = re.findall(r"\w+", keyword or "")
+        if not terms:
+            return []
+        if not self.has_fts():
+            pattern = f"%{keyword.strip()}%"
+            return self._execute_query(
+                "SELECT * FROM tools WHERE name LIKE ? OR category LIKE ? OR location LIKE ? "
+                "ORDER BY tool_id LIMIT ? OFFSET ?", (pattern, pattern, pattern, limit, offset), fetch=True)
+        match = " ".join(f'"{term}"*' for term in terms)
+        query = """SELECT tools.* FROM tools_fts
+                   JOIN tools ON tools.tool_id = tools_fts.rowid
+                   WHERE tools_fts MATCH ?
+                   ORDER BY bm25(tools_fts, 10.0, 5.0, 1.0)
+                   LIMIT ? OFFSET ?"""
+        return self._execute_query(query, (match, limit, offset), fetch=True)
+
+    def _summary(self, dimension, value_column):
+        rows = self._execute_query(f"SELECT key, {value_column} FROM tool_summary WHERE dimension = ? ORDER BY key",
+                                   (dimension,), fetch=True)
+        return dict(rows)
+
+    def count_tools(self):
+        """Return the number of tools, read from the summary table."""
+        return sum(self.status_counts().values())
+
+    def category_counts(self):
+        """Return {category: number of tools}."""
+        return self._summary("category", "tool_count")
+
+    def status_counts(self):
+        """Return {status: number of tools}."""
+        return self._summary("status", "tool_count")
+
+    def quantity_by_location(self):
+        """Return {location: total quantity}; tools without a location are keyed ''."""
+        return self._summary("location", "quantity")
+
+    def change_version(self):
+        """Return the latest tool row_version; pass it to tool_changes_since later."""
+        rows = self._execute_query("SELECT version FROM change_counter WHERE id = 1", fetch=True)
+        return rows[0][0] if rows else 0
+
+    def tool_changes_since(self, version, columns=None, max_changes=None):
+        """Return (latest_version, changed_rows, deleted_ids) for tools changed after version.
+
+        Everything is read in one snapshot, so applying the result and then
+        asking again from latest_version never misses or repeats a change.
+        If more than max_changes tools changed, rows and ids are returned as
+        None and the caller should reload instead.
+        """
+        columns = tuple(columns or TOOL_COLUMNS)
+        _check_columns(columns)
+        with self._reader() as conn:
+            conn.execute("BEGIN")
+            try:
+                latest, changed_ids, deleted = _read_changes(conn, version, max_changes)
+                if changed_ids is None:
+                    return latest, None, None
+                rows = []
+                for start in range(0, len(changed_ids), 500):
+                    chunk = changed_ids[start:start + 500]
+                    rows.extend(conn.execute(
+                        f"SELECT {', '.join(columns)} FROM tools WHERE tool_id IN ({', '.join('?' * len(chunk))})",
+                        chunk).fetchall())
+            finally:
+                conn.rollback()
+        return latest, rows, deleted
+
+    def tool_change_ids_since(self, version, max_changes=None):
+        """Return (latest_version, changed_ids, deleted_ids) without reading the tool rows.
+
+        As with tool_changes_since, the ids are None when more than
+        max_changes tools changed.
+        """
+        with self._reader() as conn:
+            conn.execute("BEGIN")
+            try:
+                return _read_changes(conn, version, max_changes)
+            finally:
+                conn.rollback()
+
     def fetch_tool_by_name(self, name):
         """Fetch a tool by its name."""
         return self._execute_query("SELECT * FROM tools WHERE name=?", (name,), fetch=True)
@@ -142,61 +1200,192 @@ class DatabaseManager:
 
     def borrow_tool(self, tool_id, user_id, borrower_name, borrow_date):
         """Borrow a tool."""
-        self.ensure_connection_open()
-        try:
-            with closing(self.conn.cursor()) as cursor:
-                tool_update_query = """
-                    UPDATE tools SET 
-                        quantity = quantity - 1,
-                        status = CASE WHEN quantity - 1 = 0 THEN 'unavailable' ELSE 'available' END,
-                        user_id = ?, borrower = ?, borrow_date = ? 
-                    WHERE tool_id = ? AND quantity > 0
-                """
-                cursor.execute(tool_update_query, (user_id, borrower_name, borrow_date, tool_id))
-                if cursor.rowcount == 0:
-                    raise ValueError("Tool is unavailable or quantity is insufficient.")
-
-                transaction_query = """
-                    INSERT INTO transactions (tool_id, user_id, transaction_type, transaction_date)
-                    VALUES (?, ?, 'borrow', ?)
-                """
-                cursor.execute(transaction_query, (tool_id, user_id, borrow_date))
-                self.conn.commit()
-        except Exception as e:
-            logger.error(f"Error in borrow_tool: {e}")
-            self.conn.rollback()
-            raise
+        with self._writer() as conn:
+            try:
+                with closing(conn.cursor()) as cursor:
+                    cursor.execute(BORROW_UPDATE, (user_id, borrower_name, borrow_date, tool_id))
+                    if cursor.rowcount == 0:
+                        raise ValueError("Tool is unavailable or quantity is insufficient.")
+                    cursor.execute(BORROW_INSERT, (tool_id, user_id, borrow_date))
+                    conn.commit()
+            except Exception as e:
+                logger.error(f"Error in borrow_tool: {e}")
+                conn.rollback()
+                raise
 
     def return_tool(self, tool_id, user_id, return_date):
         """Return a borrowed tool."""
-        self.ensure_connection_open()
-        try:
-            with closing(self.conn.cursor()) as cursor:
-                cursor.execute("""UPDATE tools SET status = 'available', borrower = NULL, borrow_date = NULL, user_id = NULL
-                                  WHERE tool_id = ? AND borrower IS NOT NULL""", (tool_id,))
-                cursor.execute("""
-                    INSERT INTO transactions (tool_id, user_id, transaction_type, transaction_date)
-                    VALUES (?, ?, 'return', ?)
-                """, (tool_id, user_id, return_date))
-                self.conn.commit()
-                return cursor.rowcount > 0
-        except Exception as e:
-            logger.error(f"Error in return_tool: {e}")
-            self.conn.rollback()
-            return False
+        with self._writer() as conn:
+            try:
+                with closing(conn.cursor()) as cursor:
+                    cursor.execute(RETURN_UPDATE, (tool_id,))
+                    if cursor.rowcount == 0:
+                        conn.rollback()
+                        return False  # not currently borrowed; don't log a return
+                    cursor.execute(RETURN_INSERT, (tool_id, user_id, return_date))
+                    conn.commit()
+                    return True
+            except Exception as e:
+                logger.error(f"Error in return_tool: {e}")
+                conn.rollback()
+                return False
+
+    def borrow_many(self, items, policy="all_or_nothing"):
+        """Borrow a batch of (tool_id, user_id, borrower_name, borrow_date) items in one transaction.
+
+        With policy="all_or_nothing" any unavailable tool rolls back the whole
+        batch; with "best_effort" each item runs under its own savepoint and
+        only the failed ones are skipped. Returns a BatchResult per item.
+        """
+        items = list(items)
+        updates = [(user_id, borrower, date, tool_id) for tool_id, user_id, borrower, date in items]
+        inserts = [(tool_id, user_id, date) for tool_id, user_id, borrower, date in items]
+        return self._run_batch("borrow_many", items, policy, BORROW_UPDATE, updates, BORROW_INSERT, inserts,
+                               "Tool is unavailable or quantity is insufficient.")
+
+    def return_many(self, items, policy="all_or_nothing"):
+        """Return a batch of (tool_id, user_id, return_date) items in one transaction.
+
+        Same policies as borrow_many; an item fails if the tool is not currently borrowed.
+        """
+        items = list(items)
+        updates = [(tool_id,) for tool_id, user_id, date in items]
+        inserts = [(tool_id, user_id, date) for tool_id, user_id, date in items]
+        return self._run_batch("return_many", items, policy, RETURN_UPDATE, updates, RETURN_INSERT, inserts,
+                               "Tool is not currently borrowed.")
+
+    def _run_batch(self, name, items, policy, update_query, updates, insert_query, inserts, failure):
+        if policy not in BATCH_POLICIES:
+            raise ValueError(f"Unknown batch policy '{policy}'.")
+        if not items:
+            return []
+        if policy == "all_or_nothing":
+            try:
+                with self.transaction() as conn, closing(conn.cursor()) as cursor:
+                    cursor.executemany(update_query, updates)
+                    if cursor.rowcount != len(updates):
+                        raise _BatchConflict()
+                    cursor.executemany(insert_query, inserts)
+                return [BatchResult(index, True, None) for index in range(len(items))]
+            except _BatchConflict:
+                pass
+            # Re-run item by item inside a transaction that is always rolled back,
+            # purely to report which items made the batch fail.
+            with self._writer() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    outcome = self._apply_each(conn, update_query, updates, failure)
+                finally:
+                    conn.rollback()
+            logger.error(f"{name}: batch of {len(items)} rolled back")
+            return [BatchResult(index, False, error or "Rolled back with the rest of the batch.")
+                    for index, error in enumerate(outcome)]
+
+        with self.transaction() as conn:
+            outcome = self._apply_each(conn, update_query, updates, failure)
+            conn.executemany(insert_query, [row for row, error in zip(inserts, outcome) if error is None])
+        return [BatchResult(index, error is None, error) for index, error in enumerate(outcome)]
+
+    @staticmethod
+    def _apply_each(conn, query, rows, failure):
+        """Apply query per row under a savepoint; return None or an error message per row."""
+        outcome = []
+        with closing(conn.cursor()) as cursor:
+            for row in rows:
+                cursor.execute("SAVEPOINT batch_item")
+                try:
+                    cursor.execute(query, row)
+                    if cursor.rowcount == 0:
+                        raise ValueError(failure)
+                    cursor.execute("RELEASE batch_item")
+                    outcome.append(None)
+                except (ValueError, sqlite3.Error) as e:
+                    cursor.execute("ROLLBACK TO batch_item")
+                    cursor.execute("RELEASE batch_item")
+                    outcome.append(str(e))
+        return outcome
+
+    def apply_operations(self, operations):
+        """Apply (op, args) operations in one transaction, each under its own savepoint.
+
+        op is "borrow" with (tool_id, user_id, borrower, date), "return" with
+        (tool_id, user_id, date) or "add" with a validate_tool_row tuple. An
+        operation that fails is rolled back alone; the rest commit together.
+        Returns a BatchResult per operation.
+        """
+        results = []
+        with self.transaction() as conn, closing(conn.cursor()) as cursor:
+            for index, (op, args) in enumerate(operations):
+                cursor.execute("SAVEPOINT replay_item")
+                try:
+                    _apply_operation(cursor, op, args)
+                    cursor.execute("RELEASE replay_item")
+                    results.append(BatchResult(index, True, None))
+                except (ValueError, sqlite3.Error) as e:
+                    cursor.execute("ROLLBACK TO replay_item")
+                    cursor.execute("RELEASE replay_item")
+                    results.append(BatchResult(index, False, str(e)))
+        return results
 
     def insert_tool(self, name, category, condition, quantity, location):
-        """Insert a new tool into the database."""
+        """Insert a new tool into the database; raises ValueError if a field is invalid."""
+        row = validate_tool_row({"name": name, "category": category, "condition": condition,
+                                 "quantity": quantity, "location": location})
         query = '''INSERT INTO tools (name, category, condition, quantity, location, status) 
                    VALUES (?, ?, ?, ?, ?, ?)'''
         try:
-            self._execute_query(query, (name, category, condition, quantity, location, 'available'))
+            self._execute_query(query, row)
             logger.info(f"Inserted tool: {name}")
             return True
         except Exception as e:
             logger.error(f"Error inserting tool: {e}")
             return False
 
+    def bulk_import(self, table, records, chunk_size=5000, on_reject=None):
+        """Stream records (dicts) into tools or transactions.
+
+        Records are validated one at a time and written with executemany in
+        one transaction per chunk, so memory stays bounded by chunk_size.
+        Invalid records, including ones that are not dicts (a JSONL line
+        holding a list, say), are passed to on_reject(row_number, record, error).
+        Returns a dict with imported/rejected counts, elapsed seconds and rows/sec.
+        """
+        if table not in BULK_IMPORTS:
+            raise ValueError(f"Cannot bulk import into '{table}'.")
+        query, validate = BULK_IMPORTS[table]
+        imported = rejected = 0
+        started = time.perf_counter()
+
+        def valid_rows():
+            nonlocal rejected
+            for row_number, record in enumerate(records, start=1):
+                try:
+                    if not isinstance(record, dict):
+                        raise ValueError(f"Record must be an object, got {type(record).__name__}.")
+                    yield validate(record)
+                except ValueError as e:
+                    rejected += 1
+                    if on_reject:
+                        on_reject(row_number, record, str(e))
+
+        rows = valid_rows()
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            try:
+                with self.transaction() as conn:
+                    conn.executemany(query, chunk)
+            except Exception as e:
+                logger.error(f"Error in bulk_import after {imported} rows: {e}")
+                raise
+            imported += len(chunk)
+
+        seconds = time.perf_counter() - started
+        logger.info(f"Bulk imported {imported} {table} rows ({rejected} rejected) in {seconds:.2f}s")
+        return {"imported": imported, "rejected": rejected, "seconds": seconds,
+                "rows_per_sec": imported / seconds if seconds else 0.0}
+
     def insert_user(self, username, password, name, age, email):
         """Insert a new user into the database."""
         try:
@@ -218,8 +1407,21 @@ class DatabaseManager:
 
     def close(self):
         """Close the database connection.""" 
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+        if self._version_conn is not None:
+            with self._version_lock:
+                self._version_conn.close()
+                self._version_conn = None
+                self._data_version = None
+        if self._query_cache is not None:
+            self._query_cache.clear()
         if self.conn:
-            self.conn.close()
+            with self._write_lock:
+                self.conn.close()
+                self.conn = None
+                self.cursor = None
             logger.info("Database connection closed.")
 
 # Example usage
@@ -0,0 +1,137 @@
+import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class Task:
+    """Handle for a submitted call; cancel() drops its callbacks if it has not been delivered yet."""
+
+    def __init__(self, on_success, on_error):
+        self.on_success = on_success
+        self.on_error = on_error
+        self.future = None
+        self.cancelled = False
+
+    def cancel(self):
+        # The call itself still runs if it has started (SQLite cannot be
+        # interrupted safely from here); only its callbacks are dropped.
+        self.cancelled = True
+
+
+class CancelScope:
+    """Groups tasks so they can be cancelled together, e.g. when a dialog closes."""
+
+    def __init__(self):
+        self.tasks = []
+        self.cancelled = False
+
+    def add(self, task):
+        self.tasks = [t for t in self.tasks if not (t.future and t.future.done())]
+        self.tasks.append(task)
+        if self.cancelled:
+            task.cancel()
+
+    def cancel(self):
+        self.cancelled = True
+        for task in self.tasks:
+            task.cancel()
+        self.tasks.clear()
+
+
+class DatabaseWorker:
+    """Runs database calls on worker threads and hands results back to Tk.
+
+    Results are queued by the workers and drained on the Tk main thread by a
+    widget.after() poll, so callbacks can touch widgets safely and the main
+    thread never waits on SQLite.
+    """
+
+    def __init__(self, workers=2, poll_ms=25):
+        self.poll_ms = poll_ms
+        self.pending = 0
+        self.on_busy = None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lms-db")
+        self._results = queue.Queue()
+        self._widget = None
+        self._after_id = None
+
+    def attach(self, widget):
+        """Deliver results through widget's event loop (re-attach when the window changes)."""
+        self.detach()
+        self._widget = widget
+        self._after_id = widget.after(self.poll_ms, self._poll)
+
+    def detach(self):
+        if self._widget is not None and self._after_id is not None:
+            try:
+                self._widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+        self._widget = None
+        self._after_id = None
+
+    def scope_for(self, window):
+        """Return a CancelScope that is cancelled when window is destroyed."""
+        scope = CancelScope()
+        window.bind("<Destroy>", lambda event: scope.cancel() if event.widget is window else None, add="+")
+        return scope
+
+    def submit(self, func, *args, on_success=None, on_error=None, scope=None, **kwargs):
+        """Run func(*args, **kwargs) on a worker; call on_success(result) or on_error(exc) on the Tk thread."""
+        task = Task(on_success, on_error)
+        if scope is not None:
+            scope.add(task)
+        self._set_pending(self.pending + 1)
+        task.future = self._executor.submit(self._run, task, func, args, kwargs)
+        return task
+
+    def post(self, callback, value):
+        """Call callback(value) on the Tk thread; safe to use from any thread."""
+        self._results.put((Task(callback, None), True, value, False))
+
+    def _run(self, task, func, args, kwargs):
+        if task.cancelled:
+            self._results.put((task, False, None, True))
+            return
+        try:
+            self._results.put((task, True, func(*args, **kwargs), True))
+        except Exception as e:
+            self._results.put((task, False, e, True))
+
+    def _poll(self):
+        try:
+            while True:
+                task, ok, value, submitted = self._results.get_nowait()
+                if submitted:
+                    self._set_pending(self.pending - 1)  # never raises, so the poll keeps running
+                if task.cancelled:
+                    continue
+                callback = task.on_success if ok else task.on_error
+                if callback is not None:
+                    try:
+                        callback(value)
+                    except Exception as e:
+                        logger.error(f"Error in database worker callback: {e}")
+                elif not ok:
+                    logger.error(f"Database task failed: {value}")
+        except queue.Empty:
+            pass
+        if self._widget is not None:
+            self._after_id = self._widget.after(self.poll_ms, self._poll)
+
+    def _set_pending(self, pending):
+        was_busy = self.pending > 0
+        self.pending = max(0, pending)
+        if self.on_busy is not None and was_busy != (self.pending > 0):
+            try:
+                self.on_busy(self.pending > 0)
+            except Exception as e:
+                # e.g. the indicator's window is gone; stop calling it rather than break submit/poll
+                logger.error(f"Error in busy indicator callback: {e}")
+                self.on_busy = None
+
+    def shutdown(self):
+        self.detach()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,242 @@
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from database import DatabaseManager, EXPORTS
+from colorama import Fore, Style, init
+
+init(autoreset=True)
+
+
+def detect_format(path, explicit=None):
+    """Return (format, gzip) from the explicit format or the file extension."""
+    compress = path.lower().endswith(".gz")
+    if explicit:
+        return explicit, compress
+    name = path.lower()[:-3] if compress else path.lower()
+    return ("jsonl" if name.endswith((".jsonl", ".ndjson", ".json")) else "csv"), compress
+
+
+def format_rows(columns, rows, fmt, buffer, writer):
+    """Render one batch of rows as text, reusing buffer (a StringIO) and writer (csv or None)."""
+    buffer.seek(0)
+    buffer.truncate()
+    if fmt == "csv":
+        writer.writerows(rows)
+    else:
+        for row in rows:
+            buffer.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+            buffer.write("\n")
+    return buffer.getvalue().encode("utf-8")
+
+
+class ExportFile:
+    """Byte sink for an export that can be checkpointed and reopened at the checkpoint.
+
+    A gzip export is written as a series of gzip members, one per
+    checkpoint: a member ends at every checkpoint, so the file can be cut
+    back to that offset and appended to, and gzip readers see one stream.
+    """
+
+    def __init__(self, path, compress, offset=0):
+        self.path = path
+        self.compress = compress
+        if path == "-":
+            self.raw = sys.stdout.buffer
+            self.written = 0
+        else:
+            self.raw = open(path, "r+b" if offset else "wb")
+            self.raw.truncate(offset)  # drop anything written after the last checkpoint
+            self.raw.seek(offset)
+        self.stream = None
+
+    def write(self, data):
+        if self.stream is None:
+            self.stream = gzip.GzipFile(fileobj=self.raw, mode="wb", compresslevel=6) if self.compress else self.raw
+        self.stream.write(data)
+        if self.raw is sys.stdout.buffer:
+            self.written += len(data)
+
+    def tell(self):
+        """Bytes in the output so far (compressed for gzip, approximately until the next checkpoint)."""
+        return self.written if self.raw is sys.stdout.buffer else self.raw.tell()
+
+    def checkpoint(self):
+        """Make everything written so far durable; returns the file offset to resume from."""
+        if self.stream is not None and self.stream is not self.raw:
+            self.stream.close()  # ends the gzip member; the raw file stays open
+        self.stream = None
+        self.raw.flush()
+        if self.raw is not sys.stdout.buffer:
+            os.fsync(self.raw.fileno())
+            return self.raw.tell()
+        return None
+
+    def close(self):
+        self.checkpoint()
+        if self.raw is not sys.stdout.buffer:
+            self.raw.close()
+
+
+def read_checkpoint(path):
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return None
+
+
+def write_checkpoint(path, state):
+    partial = path + ".part"
+    with open(partial, "w", encoding="utf-8") as handle:
+        json.dump(state, handle)
+    os.replace(partial, path)
+
+
+class Progress:
+    """Prints rows, throughput and an estimate of how far through the key range the export is."""
+
+    def __init__(self, key_range, out=sys.stderr, interval=1.0):
+        self.low, self.high = key_range
+        self.out = out
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.shown = self.started
+        self.inline = out.isatty()
+
+    def update(self, rows, written, last_key, final=False):
+        now = time.perf_counter()
+        if not final and now - self.shown < self.interval:
+            return
+        self.shown = now
+        elapsed = now - self.started
+        line = f"{rows:,} rows  {rows / elapsed if elapsed else 0:,.0f} rows/sec  {written / 1e6:,.1f} MB"
+        if final:
+            line += "  100%"
+        elif last_key is not None and self.high and self.high > self.low:
+            line += f"  ~{min(100.0, (last_key - self.low) * 100.0 / (self.high - self.low)):.0f}%"
+        if self.inline:
+            self.out.write("\r" + line + ("\n" if final else ""))
+        else:
+            self.out.write(line + "\n")
+        self.out.flush()
+
+
+def run_export(db, kind, path, fmt=None, filters=None, resume=False, batch_size=1000,
+               checkpoint_every=100000, progress=None):
+    """Stream an export to path ("-" for stdout) and return its stats.
+
+    Unless writing to stdout, <path>.checkpoint records the last exported key
+    and the file offset every checkpoint_every rows; with resume=True an
+    interrupted export continues from there instead of starting over. The
+    checkpoint file is removed once the export completes.
+    """
+    fmt, compress = detect_format(path, fmt)
+    columns = EXPORTS[kind].columns
+    filters = {name: value for name, value in (filters or {}).items() if value is not None}
+    checkpoint_path = None if path == "-" else path + ".checkpoint"
+    state = {"kind": kind, "format": fmt, "gzip": compress, "filters": filters,
+             "last_key": None, "rows": 0, "offset": 0}
+
+    saved = read_checkpoint(checkpoint_path) if resume and checkpoint_path else None
+    if saved:
+        if any(saved.get(name) != state[name] for name in ("kind", "format", "gzip", "filters")):
+            raise ValueError(f"{checkpoint_path} belongs to a different export; remove it or drop --resume.")
+        state = dict(saved)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    sink = ExportFile(path, compress, state["offset"])
+    rows_written = state["rows"]
+    since_checkpoint = 0
+    started = time.perf_counter()
+    try:
+        if state["offset"] == 0 and fmt == "csv":
+            writer.writerow(columns)
+            sink.write(buffer.getvalue().encode("utf-8"))
+        batch = []
+        for row in db.iter_export(kind, filters, after=state["last_key"], batch_size=batch_size):
+            batch.append(row)
+            if len(batch) < batch_size:
+                continue
+            sink.write(format_rows(columns, batch, fmt, buffer, writer))
+            rows_written += len(batch)
+            since_checkpoint += len(batch)
+            state["last_key"] = batch[-1][0]
+            batch = []
+            if checkpoint_path and since_checkpoint >= checkpoint_every:
+                state.update(rows=rows_written, offset=sink.checkpoint())
+                write_checkpoint(checkpoint_path, state)
+                since_checkpoint = 0
+            if progress:
+                progress.update(rows_written, sink.tell(), state["last_key"])
+        if batch:
+            sink.write(format_rows(columns, batch, fmt, buffer, writer))
+            rows_written += len(batch)
+            state["last_key"] = batch[-1][0]
+    finally:
+        sink.close()
+    written = sink.tell() if path == "-" else os.path.getsize(path)
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    if progress:
+        progress.update(rows_written, written, state["last_key"], final=True)
+
+    seconds = time.perf_counter() - started
+    this_run = rows_written - (saved["rows"] if saved else 0)
+    return {"rows": rows_written, "bytes": written,
+            "seconds": seconds, "rows_per_sec": this_run / seconds if seconds else 0.0,
+            "resumed_from": saved["last_key"] if saved else None}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export transaction history or the tool inventory to CSV/JSONL.")
+    parser.add_argument("kind", choices=sorted(EXPORTS))
+    parser.add_argument("path", help="output file; .gz compresses, '-' writes to stdout")
+    parser.add_argument("--db", default=os.path.join("db", "inventory.db"), help="database path")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="output format (default: from extension)")
+    parser.add_argument("--since", help="transactions on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--until", help="transactions on or before this date (YYYY-MM-DD)")
+    parser.add_argument("--type", choices=["borrow", "return"], help="only this transaction type")
+    parser.add_argument("--tool-id", type=int, help="only this tool")
+    parser.add_argument("--user-id", type=int, help="only this user")
+    parser.add_argument("--category", help="only tools in this category")
+    parser.add_argument("--condition", help="only tools in this condition")
+    parser.add_argument("--status", help="only tools with this status")
+    parser.add_argument("--location", help="only tools at this location")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted export from its checkpoint")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows fetched per round trip")
+    parser.add_argument("--checkpoint-every", type=int, default=100000, help="rows between checkpoints")
+    parser.add_argument("--quiet", action="store_true", help="no progress output")
+    args = parser.parse_args(argv)
+
+    filters = {name: getattr(args, name) for name in EXPORTS[args.kind].filters}
+    unused = [f"--{name.replace('_', '-')}" for name in ("since", "until", "type", "tool_id", "user_id", "category",
+                                                         "condition", "status", "location")
+              if name not in filters and getattr(args, name) is not None]
+    if unused:
+        parser.error(f"{', '.join(unused)} cannot filter a {args.kind} export")
+
+    db = DatabaseManager(args.db)
+    try:
+        progress = None if args.quiet else Progress(db.export_key_range(args.kind))
+        stats = run_export(db, args.kind, args.path, args.format, filters, args.resume,
+                           args.batch_size, args.checkpoint_every, progress)
+    except KeyboardInterrupt:
+        print(Fore.YELLOW + "\nInterrupted; rerun with --resume to continue." + Style.RESET_ALL, file=sys.stderr)
+        return 130
+    finally:
+        db.close()
+
+    resumed = f" (resumed after key {stats['resumed_from']})" if stats["resumed_from"] is not None else ""
+    print(Fore.GREEN + f"Exported {stats['rows']} rows, {stats['bytes'] / 1e6:.1f} MB in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_sec']:.0f} rows/sec){resumed}." + Style.RESET_ALL, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,24 +5,41 @@ from tkinter import StringVar, ttk
 import customtkinter as ctk
 from tkinter import messagebox
 from tkinter import simpledialog
-from PIL import Image, ImageTk
-from matplotlib.figure import Figure
-from database import DatabaseManager
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from widgets import PieChart, ToolRowSource, VirtualTreeview
+from app_context import AppContext
 
 
 
+# Database columns behind the ID/Name/Category/Condition/Quantity/Status tables
+TABLE_COLUMNS = ("tool_id", "name", "category", "condition", "quantity", "status")
+
+# Above this many changed tools a refresh reloads the view instead of patching it
+MAX_PATCHED_CHANGES = 2000
+# Chart refresh requests within this window are merged into one query and redraw
+PIE_CHART_DEBOUNCE_MS = 200
+# View Tools: wait this long after the last keystroke before querying, then page this many rows at a time
+FILTER_DEBOUNCE_MS = 250
+TOOLS_LIST_PAGE_SIZE = 200
+FILTER_ANY = "Any"
+
+
+def format_table_row(tool):
+    """Display values for a TABLE_COLUMNS row."""
+    borrowed_status = "Borrowed" if tool[5] == 'borrowed' else "Available"
+    return (tool[0], tool[1], tool[2], tool[3], tool[4], borrowed_status)
+
+
 ctk.set_appearance_mode("dark")  
 ctk.set_default_color_theme("dark-blue")
 
 
 class LoginApp:
-    def __init__(self, db_path):
+    def __init__(self, context):
         print("Initializing LoginApp...")
-        self.db_path = db_path  
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        self.db = DatabaseManager(self.db_path)  
+        self.context = context
+        self.db = context.db
+        self.worker = context.worker
+        self.user_id = None  # set once a login succeeds
         self.create_login_window()
         
     def create_login_window(self):
@@ -31,10 +48,11 @@ class LoginApp:
         self.login_window.geometry('600x450')
         self.login_window.title('Login to Project-LMS')
         self.login_window.resizable(False, False)  
+        self.worker.attach(self.login_window)
 
         # Background image with a modern, sleek design
         bg_image_path = "assets/background_image.jpg"  # Pwede to Palitan Kayo na Bahala
-        bg_image = Image.open(bg_image_path)
+        bg_image = self.context.images.load(bg_image_path, (1280, 720))
         self.bg_image = ctk.CTkImage(light_image=None, dark_image=bg_image, size=(1280, 720))
         bg_label = ctk.CTkLabel(self.login_window, image=self.bg_image)
         bg_label.place(relwidth=1, relheight=1)
@@ -91,19 +109,26 @@ class LoginApp:
             self.error_label.configure(text="Please fill in both fields")
             return
 
-        user = self.db.get_user(username, password)
+        self.login_button.configure(state="disabled")
+        self.worker.submit(self.db.get_user, username, password, on_success=self.finish_login,
+                           on_error=lambda e: self.login_failed(f"Login failed: {e}"))
 
+    def finish_login(self, user):
         if user:
             # Since user is a list, we need to extract the tuple first
             user_tuple = user[0]  # Get the first element of the list, which is the tuple
             self.user_id = user_tuple[0]  # Now extract the ID from the tuple
             print(f"Login successful. User ID: {self.user_id}")  # This should now print just the ID (e.g., 1)
 
-            # Destroy the login window and initialize ToolManagementApp
+            # Destroy the login window; main() then opens the dashboard
+            self.worker.detach()
             self.login_window.destroy()
-            ToolManagementApp(self.user_id, self.db)  # Pass only the user ID (just integer)
         else:
-            self.error_label.configure(text="Incorrect username or password.")
+            self.login_failed("Incorrect username or password.")
+
+    def login_failed(self, message):
+        self.login_button.configure(state="normal")
+        self.error_label.configure(text=message)
 
 
 
@@ -112,6 +137,7 @@ class LoginApp:
         self.signup_window = ctk.CTk()
         self.signup_window.geometry('500x600+200+200')  
         self.signup_window.title('Sign Up for Project-LMS')
+        self.worker.attach(self.signup_window)
         
         # Main frame for signup with a custom background
         signup_frame = ctk.CTkFrame(self.signup_window, corner_radius=15, fg_color="transparent", border_width=2, border_color="#444444")
@@ -120,8 +146,8 @@ class LoginApp:
         # Load Image
         bg_image_path_light = "assets/background_image_light.jpg"
         bg_image_path_dark = "assets/background_image.jpg"
-        bg_image_light = Image.open(bg_image_path_light)
-        bg_image_dark = Image.open(bg_image_path_dark)
+        bg_image_light = self.context.images.load(bg_image_path_light, (500, 600))
+        bg_image_dark = self.context.images.load(bg_image_path_dark, (500, 600))
         
         # Create CTkImage with size
         self.bg_image = ctk.CTkImage(light_image=bg_image_light, dark_image=bg_image_dark, size=(500, 600))
@@ -253,12 +279,19 @@ class LoginApp:
             return
 
         # Register the user in the database
-        if self.db.insert_user(username, password, name, age, email):
+        self.signup_button.configure(state="disabled")
+        self.worker.submit(self.db.insert_user, username, password, name, age, email,
+                           on_success=self.finish_signup, on_error=lambda e: self.finish_signup(False, e))
+
+    def finish_signup(self, registered, error=None):
+        if registered:
             self.signup_error_label.configure(text="Signup successful!")
             self.signup_window.destroy()  # Close the signup window
             self.create_login_window()  # Create and show the login window
         else:
-            self.signup_error_label.configure(text="Signup failed. Try again.")
+            self.signup_button.configure(state="normal")
+            # e.g. a server that only lets logged-in users create accounts says so
+            self.signup_error_label.configure(text=f"Signup failed: {error}" if error else "Signup failed. Try again.")
 
     def back_to_login(self):
         self.signup_window.destroy()
@@ -270,11 +303,19 @@ class LoginApp:
 
 
 class ToolManagementApp:
-    def __init__(self, user_id, db):
+    def __init__(self, user_id, context):
         print(f"Received user_id type: {type(user_id)} and value: {user_id}")
         self.user_id = user_id
-        self.db_path = db_path
-        self.db = DatabaseManager(db_path)
+        self.context = context
+        self.db = context.db
+        self.seen_version = None  # tool row_version the tables were last synced to
+        self.worker = context.worker  # all database access happens off the Tk thread
+        # Picks up changes made by other GUI/CLI instances sharing the database
+        self.change_feed = context.change_feed
+        self.unsubscribe = None
+        self.logged_out = False
+        self.pie_chart = None
+        self.pie_chart_after = None  # pending debounced chart refresh
         print(f"ToolManagementApp initialized with user_id: {self.user_id}")
         self.create_dashboard_window()
 
@@ -283,6 +324,7 @@ class ToolManagementApp:
         self.window = ctk.CTk()
         self.window.geometry('1280x720')
         self.window.title('Learner Management System')
+        self.worker.attach(self.window)
 
         # Sidebar
         sidebar = ctk.CTkFrame(self.window, width=250, fg_color="#2b2b2b", corner_radius=0)
@@ -290,8 +332,8 @@ class ToolManagementApp:
 
         # Profile Section
         profile_image_path = "assets/user.png"
-        profile_image = Image.open(profile_image_path).resize((180, 180))
-        self.profile_image_ctk = ctk.CTkImage(light_image=None, dark_image=profile_image)
+        profile_image = self.context.images.load(profile_image_path, (180, 180))
+        self.profile_image_ctk = ctk.CTkImage(light_image=None, dark_image=profile_image, size=(180, 180))
 
         profile_label = ctk.CTkLabel(sidebar, image=self.profile_image_ctk, text="")
         profile_label.pack(pady=(30, 20))
@@ -321,79 +363,129 @@ class ToolManagementApp:
 
         # Inventory Table Section
         inventory_label = ctk.CTkLabel(dashboard_frame, text="Inventory Overview", font=("Roboto", 20))
-        inventory_label.pack(pady=(20, 10))
-
-        self.inventory_table = ttk.Treeview(dashboard_frame, columns=("ID", "Name", "Category", "Condition", "Quantity", "Status"), show="headings")
+        inventory_label.pack(pady=(20, 0))
+
+        # Loading indicator, shown while database work is in flight
+        self.status_label = ctk.CTkLabel(dashboard_frame, text="", font=("Roboto", 12), text_color="gray")
+        self.status_label.pack()
+        self.worker.on_busy = self.show_busy
+        # The worker outlives this window; unhook the indicator however the window goes away
+        self.status_label.bind("<Destroy>", lambda event: self.clear_busy_indicator(), add="+")
+
+        # Only the rows in view are kept in the widget; pages are fetched as the user scrolls
+        self.inventory_source = ToolRowSource(self.db, TABLE_COLUMNS, format_table_row)
+        self.inventory_table = VirtualTreeview(dashboard_frame, self.inventory_source,
+                                               columns=("ID", "Name", "Category", "Condition", "Quantity", "Status"),
+                                               loader=self.load_in_background)
         self.inventory_table.pack(pady=10, padx=20, fill="both", expand=True)
 
         for col in self.inventory_table["columns"]:
             self.inventory_table.heading(col, text=col, command=lambda col=col: self.sort_inventory(col))  # Added sorting feature
             self.inventory_table.column(col, width=150)
 
-        self.update_inventory_table()
-
         # Pie Chart Section
         pie_chart_label = ctk.CTkLabel(dashboard_frame, text="Tool Categories Distribution", font=("Roboto", 20))
         pie_chart_label.pack(pady=(20, 10))
 
-        # Initialize pie chart canvas only once here
+        # The chart (and matplotlib) is created when the first counts arrive
         self.pie_chart_canvas = ctk.CTkFrame(dashboard_frame)
         self.pie_chart_canvas.pack(pady=10, padx=20, fill="both", expand=True)
 
-        self.update_pie_chart()
+        if self.context.chart_data is not None:
+            self.draw_pie_chart(self.context.chart_data)  # counts from the previous session, refreshed below
+
+        self.update_inventory_table()
+        self.unsubscribe = self.change_feed.subscribe(lambda event: self.worker.post(self.on_tool_changes, event))
         self.window.mainloop()
 
+    def load_in_background(self, func, on_success, on_error):
+        self.worker.submit(func, on_success=on_success, on_error=on_error)
+
     def update_inventory_table(self):
-        # Clear existing data
-        for row in self.inventory_table.get_children():
-            self.inventory_table.delete(row)
+        if self.seen_version is None:
+            # First load: re-count and draw just the visible window of rows
+            self.worker.submit(self.db.change_version, on_success=self.start_inventory_table)
+        else:
+            # Afterwards only patch in the tools changed since the last sync
+            self.worker.submit(self.read_tool_changes, self.seen_version, on_success=self.apply_tool_changes)
 
-        # Fetch and insert new data
-        tools = self.db.fetch_all_tools()
-        for tool in tools:
-            borrowed_status = "Borrowed" if tool[2] == 'borrowed' else "Available"
-            self.inventory_table.insert("", "end", values=(tool[0], tool[1], tool[2], tool[3], tool[4], borrowed_status))
+    def on_tool_changes(self, event):
+        """Change feed event, delivered on the Tk thread."""
+        if self.seen_version is not None and event.version > self.seen_version:
+            self.update_inventory_table()
 
+    def start_inventory_table(self, version):
+        self.seen_version = version
+        # The feed starts from the version the worker just read, so the Tk thread never queries for it
+        self.change_feed.start(version)
+        self.inventory_table.refresh()
         self.update_pie_chart()
 
+    def read_tool_changes(self, since):
+        """Runs on the worker: changes since the given version plus the new row count."""
+        latest, changed, deleted = self.db.tool_changes_since(since, TABLE_COLUMNS, max_changes=MAX_PATCHED_CHANGES)
+        return latest, changed, deleted, self.db.count_tools()
+
+    def apply_tool_changes(self, result):
+        latest, changed, deleted, total = result
+        if latest <= self.seen_version:
+            return  # an overlapping refresh already applied these
+        self.seen_version = latest
+        if changed is None:
+            self.inventory_table.refresh()
+            self.patch_tools_list(None, None)
+            self.update_pie_chart()
+        elif changed or deleted:
+            rows = [(str(tool[0]), format_table_row(tool)) for tool in changed]
+            deleted = [str(tool_id) for tool_id in deleted]
+            self.inventory_table.apply_changes(rows, deleted, total)
+            self.patch_tools_list(rows, deleted)
+            self.update_pie_chart()
+
     def sort_inventory(self, col):
-        """ Sort the inventory table by a column """
-        items = [(self.inventory_table.item(item)["values"], item) for item in self.inventory_table.get_children()]
-        items.sort(key=lambda x: x[0][self.inventory_table["columns"].index(col)])
+        """Sort the inventory by a column in the database; clicking the same header again reverses it."""
+        source = self.inventory_source
+        headings = self.inventory_table["columns"]
+        order_by = TABLE_COLUMNS[headings.index(col)]
+        source.descending = not source.descending if source.order_by == order_by else False
+        source.order_by = order_by
 
-        for index, (values, item) in enumerate(items):
-            self.inventory_table.item(item, values=values)
+        for heading in headings:
+            arrow = (" \u25bc" if source.descending else " \u25b2") if heading == col else ""
+            self.inventory_table.heading(heading, text=heading + arrow)
 
-        self.update_pie_chart()
+        # Pages are re-read in the new order, starting from the top
+        self.inventory_table.refresh(to_top=True)
 
     def update_pie_chart(self):
-        if hasattr(self, 'pie_chart_canvas') and self.pie_chart_canvas:
-            for widget in self.pie_chart_canvas.winfo_children():
-                widget.destroy()
-
-            tools = self.db.fetch_all_tools()  # Fetch tools from the database
-            categories = {}
-
-            # Collect categories and their counts
-            for tool in tools:
-                category = tool[2]
-                categories[category] = categories.get(category, 0) + 1
+        """Schedule a chart refresh; a burst of calls results in a single query and redraw."""
+        if not hasattr(self, 'pie_chart_canvas'):
+            return
+        if self.pie_chart_after is not None:
+            self.window.after_cancel(self.pie_chart_after)
+        self.pie_chart_after = self.window.after(PIE_CHART_DEBOUNCE_MS, self.refresh_pie_chart)
 
-            # Create Pie chart
-            fig = Figure(figsize=(4, 3), dpi=100)
-            ax = fig.add_subplot(111)
-            ax.pie(categories.values(), labels=categories.keys(), autopct='%1.1f%%', startangle=90)
-            ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
+    def refresh_pie_chart(self):
+        self.pie_chart_after = None
+        # Category counts come from the trigger-maintained summary table
+        self.worker.submit(self.db.category_counts, on_success=self.draw_pie_chart)
 
-            # Embed the pie chart in Tkinter window
-            chart_canvas = FigureCanvasTkAgg(fig, self.pie_chart_canvas)
-            chart_canvas.draw()
-            chart_canvas.get_tk_widget().pack(fill="both", expand=True)
+    def draw_pie_chart(self, categories):
+        if not self.pie_chart_canvas.winfo_exists():
+            return
+        if self.pie_chart is None:
+            # One figure for the lifetime of the dashboard, updated in place
+            self.pie_chart = PieChart(self.pie_chart_canvas)
+        self.pie_chart.update(categories)
+        self.context.chart_data = categories
 
     def borrow_tool(self):
+        # Fetch available tools in the background, then open the dialog
+        self.worker.submit(self.db.fetch_tools_by_status, 'available', on_success=self.open_borrow_dialog,
+                           on_error=lambda e: messagebox.showerror("Error", f"An error occurred: {e}"))
+
+    def open_borrow_dialog(self, available_tools):
         try:
-            # Fetch available tools
-            available_tools = self.db.fetch_tools_by_status('available')
             print(f"Available tools: {available_tools}")
 
             if not available_tools:
@@ -409,6 +501,7 @@ class ToolManagementApp:
             borrow_tool_window.geometry("400x400")
             borrow_tool_window.title("Borrow Tool")
             borrow_tool_window.attributes('-topmost', True)
+            scope = self.worker.scope_for(borrow_tool_window)  # drop pending results once the dialog closes
 
             borrow_tool_frame = ctk.CTkFrame(borrow_tool_window)
             borrow_tool_frame.pack(pady=20, padx=20, fill='both', expand=True)
@@ -464,17 +557,21 @@ class ToolManagementApp:
                 user_id = self.user_id  # user_id is already an integer
 
                 if tool_id:
-                    # Call DatabaseManager's borrow_tool method to insert a borrow record
-                    try:
-                        self.db.borrow_tool(tool_id, user_id, borrower_name, borrow_date)
+                    def borrowed(_):
                         messagebox.showinfo("Success", f"'{selected_tool_name}' borrowed by '{borrower_name}'.")
                         borrow_tool_window.destroy()
-                        self.update_inventory_table()  # Refresh inventory table
-                        self.update_pie_chart()  # Refresh pie chart
-                    except Exception as e:
+                        self.update_inventory_table()  # Refresh inventory table and pie chart
+
+                    def failed(e):
+                        borrow_button.configure(state="normal")
                         messagebox.showerror("Error", f"Failed to borrow tool: {e}")
                         print(f"Error while borrowing tool: {e}")
 
+                    # Call DatabaseManager's borrow_tool method to insert a borrow record
+                    borrow_button.configure(state="disabled")
+                    self.worker.submit(self.db.borrow_tool, tool_id, user_id, borrower_name, borrow_date,
+                                       on_success=borrowed, on_error=failed, scope=scope)
+
             # Buttons
             borrow_button = ctk.CTkButton(borrow_tool_frame, text="Borrow", command=borrow_selected_tool)
             borrow_button.grid(row=3, column=0, columnspan=2, pady=20)
@@ -500,98 +597,182 @@ class ToolManagementApp:
 
         confirm = messagebox.askyesno("Confirm Deletion", f"Are you sure you want to delete the tool '{selected_tool[1]}'?")
         if confirm:
-            self.db.delete_tool(tool_id)
-            messagebox.showinfo("Tool Deleted", f"'{selected_tool[1]}' has been deleted from the inventory.")
-            self.update_inventory_table()
-            self.update_pie_chart()
+            def deleted(_):
+                messagebox.showinfo("Tool Deleted", f"'{selected_tool[1]}' has been deleted from the inventory.")
+                self.update_inventory_table()
+
+            self.worker.submit(self.db.delete_tool, tool_id, on_success=deleted,
+                               on_error=lambda e: messagebox.showerror("Error", f"Failed to delete tool: {e}"))
             
     def view_tools(self):
         try:
             # Create a new window for viewing tools
             view_window = ctk.CTkToplevel(self.window)
-            view_window.geometry("600x500")
+            view_window.geometry("700x560")
             view_window.title("View Tools")
 
             # Make the window always stay on top
             view_window.attributes("-topmost", True)
+            self.view_tools_scope = self.worker.scope_for(view_window)
+            self.tools_filter_after = None  # pending debounced query
+            self.tools_list_task = None
+            self.tools_list_epoch = 0
+            self.tools_list_next = None
+            self.tools_list_loading = False
 
             # Title Label
             title_label = ctk.CTkLabel(view_window, text="View Tools", font=("Roboto", 20))
             title_label.pack(pady=10)
 
-            # Filter Options
+            # Filter Options: the list updates as you type or pick
             filter_frame = ctk.CTkFrame(view_window)
-            filter_frame.pack(pady=20)
-
-            filter_label = ctk.CTkLabel(filter_frame, text="Filter by Condition:", font=("Roboto", 14))
-            filter_label.grid(row=0, column=0, padx=10)
-
-            filter_entry = ctk.CTkEntry(filter_frame, font=("Roboto", 14), width=200, placeholder_text="Enter condition (e.g. 'good')")
-            filter_entry.grid(row=0, column=1, pady=10)
-
-            # Filter Button
-            filter_button = ctk.CTkButton(view_window, text="Filter", font=("Roboto", 14), command=lambda: self.filter_tools(filter_entry, view_window))
-            filter_button.pack(pady=10)
-
-            # View All Tools Button
-            view_all_button = ctk.CTkButton(view_window, text="View All Tools", font=("Roboto", 14), command=lambda: self.view_all_tools(view_window))
-            view_all_button.pack(pady=10)
-
-            # Tools Display Area (Listbox or Treeview)
-            self.tools_listbox = ttk.Treeview(view_window, columns=("ID", "Name", "Category", "Condition", "Quantity", "Status"), show="headings")
-            self.tools_listbox.pack(pady=10, padx=20, fill="both", expand=True)
+            filter_frame.pack(pady=10)
+
+            name_label = ctk.CTkLabel(filter_frame, text="Name starts with:", font=("Roboto", 14))
+            name_label.grid(row=0, column=0, padx=10, pady=5, sticky="e")
+            name_entry = ctk.CTkEntry(filter_frame, font=("Roboto", 14), width=200, placeholder_text="e.g. 'dri'")
+            name_entry.grid(row=0, column=1, pady=5)
+            name_entry.bind("<KeyRelease>", lambda event: self.schedule_tools_filter())
+
+            self.tools_filter_widgets = {"name_prefix": name_entry}
+            for index, (key, text) in enumerate((("category", "Category:"), ("condition", "Condition:"), ("status", "Status:"))):
+                row, column = (index + 1) // 2, ((index + 1) % 2) * 2
+                label = ctk.CTkLabel(filter_frame, text=text, font=("Roboto", 14))
+                label.grid(row=row, column=column, padx=10, pady=5, sticky="e")
+                menu = ctk.CTkOptionMenu(filter_frame, values=[FILTER_ANY], width=200,
+                                         command=lambda choice: self.schedule_tools_filter(0))
+                menu.grid(row=row, column=column + 1, pady=5)
+                self.tools_filter_widgets[key] = menu
+
+            clear_button = ctk.CTkButton(filter_frame, text="Clear Filters", font=("Roboto", 14), command=self.clear_tools_filter)
+            clear_button.grid(row=2, column=0, columnspan=2, padx=10, pady=5)
+
+            self.tools_list_status = ctk.CTkLabel(view_window, text="", font=("Roboto", 12))
+            self.tools_list_status.pack()
+
+            # Tools Display Area: more pages are fetched as the list is scrolled
+            list_frame = ctk.CTkFrame(view_window)
+            list_frame.pack(pady=10, padx=20, fill="both", expand=True)
+            self.tools_listbox = ttk.Treeview(list_frame, columns=("ID", "Name", "Category", "Condition", "Quantity", "Status"), show="headings")
+            scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.tools_listbox.yview)
+            self.tools_listbox.configure(yscrollcommand=lambda first, last: self.on_tools_list_scroll(scrollbar, first, last))
+            scrollbar.pack(side="right", fill="y")
+            self.tools_listbox.pack(side="left", fill="both", expand=True)
 
             for col in self.tools_listbox["columns"]:
                 self.tools_listbox.heading(col, text=col)
 
-            # Load all tools initially
+            # Fill the dropdowns, then load the first page of all tools
+            self.worker.submit(self.db.filter_options, on_success=self.set_tools_filter_options, scope=self.view_tools_scope)
             self.update_tools_list()
 
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred while viewing tools: {e}")
 
-    def filter_tools(self, filter_entry, view_window):
-        filter_condition = filter_entry.get()
-        if not filter_condition:
-            messagebox.showwarning("Invalid Input", "Please enter a condition to filter by.")
-            return
-
-        # Fetch filtered tools based on the entered condition
-        tools = self.db.fetch_tools_by_condition(filter_condition)
-        if not tools:
-            messagebox.showinfo("No Tools Found", f"No tools found with condition '{filter_condition}'.")
-        else:
-            self.update_tools_list(tools)
-            messagebox.showinfo("Filtered Tools", f"Tools with condition '{filter_condition}' displayed.")
-
-    def view_all_tools(self, view_window):
-        # Fetch all tools and update the list
-        self.update_tools_list()
-        messagebox.showinfo("View Tools", "All tools have been displayed.")
-
-    def update_tools_list(self, tools=None):
-        # Clear existing tools in the listbox
-        for item in self.tools_listbox.get_children():
-            self.tools_listbox.delete(item)
-
-        if tools is None:
-            tools = self.db.fetch_all_tools()
+    def set_tools_filter_options(self, options):
+        for key, values in options.items():
+            self.tools_filter_widgets[key].configure(values=[FILTER_ANY] + list(values))
+
+    def read_tools_filter(self):
+        widgets = self.tools_filter_widgets
+        selected = {key: widgets[key].get() for key in ("category", "condition", "status")}
+        tools_filter = {key: value for key, value in selected.items() if value != FILTER_ANY}
+        name_prefix = widgets["name_prefix"].get().strip()
+        if name_prefix:
+            tools_filter["name_prefix"] = name_prefix
+        return tools_filter
+
+    def clear_tools_filter(self):
+        widgets = self.tools_filter_widgets
+        widgets["name_prefix"].delete(0, "end")
+        for key in ("category", "condition", "status"):
+            widgets[key].set(FILTER_ANY)
+        self.schedule_tools_filter(0)
+
+    def schedule_tools_filter(self, delay=FILTER_DEBOUNCE_MS):
+        """Re-query once typing pauses; each keystroke restarts the wait."""
+        if self.tools_filter_after is not None:
+            self.tools_listbox.after_cancel(self.tools_filter_after)
+        self.tools_filter_after = self.tools_listbox.after(delay, self.update_tools_list)
+
+    def update_tools_list(self):
+        """Reload the View Tools list from the first page matching the current filters."""
+        self.tools_filter_after = None
+        if not self.tools_listbox.winfo_exists():
+            return  # the window was closed while a query was scheduled
+        self.tools_list_filter = self.read_tools_filter()
+        self.tools_list_epoch += 1  # results of older queries are ignored from now on
+        self.load_tools_page(None)
+
+    def load_tools_page(self, after):
+        epoch = self.tools_list_epoch
+        if self.tools_list_task is not None:
+            self.tools_list_task.cancel()
+        self.tools_list_loading = True
+
+        def loaded(result):
+            if epoch == self.tools_list_epoch:
+                self.show_tools_page(*result, append=after is not None)
+
+        self.tools_list_task = self.worker.submit(
+            self.db.filter_tools, columns=TABLE_COLUMNS, after=after, limit=TOOLS_LIST_PAGE_SIZE,
+            on_success=loaded, on_error=lambda e: self.tools_list_status.configure(text=f"Failed to load tools: {e}"),
+            scope=self.view_tools_scope, **self.tools_list_filter)
+
+    def show_tools_page(self, tools, next_key, append):
+        if not append:
+            # Clear existing tools in the listbox
+            self.tools_listbox.delete(*self.tools_listbox.get_children())
+        self.tools_list_next = next_key
+        self.tools_list_loading = False
 
         # Insert the tools into the listbox
         for tool in tools:
-            borrowed_status = "Borrowed" if tool[2] == 'borrowed' else "Available"
-            self.tools_listbox.insert("", "end", values=(tool[0], tool[1], tool[2], tool[3], tool[4], borrowed_status))
+            self.tools_listbox.insert("", "end", iid=str(tool[0]), values=format_table_row(tool))
+
+        shown = len(self.tools_listbox.get_children())
+        if not shown:
+            self.tools_list_status.configure(text="No tools match these filters.")
+        else:
+            self.tools_list_status.configure(text=f"{shown}{'+' if next_key else ''} tools")
+
+    def on_tools_list_scroll(self, scrollbar, first, last):
+        scrollbar.set(first, last)
+        # Fetch the next page when the end of what is loaded comes into view
+        if float(last) > 0.9 and self.tools_list_next is not None and not self.tools_list_loading:
+            self.load_tools_page(self.tools_list_next)
+
+    def patch_tools_list(self, rows, deleted):
+        """Apply changed/deleted tools to the View Tools list if it is open; rows=None reloads it."""
+        listbox = getattr(self, 'tools_listbox', None)
+        if listbox is None or not listbox.winfo_exists():
+            return
+        if rows is None:
+            self.update_tools_list()
+            return
+        # New tools are only appended to an unfiltered list that is fully loaded
+        append_new = not self.tools_list_filter and self.tools_list_next is None and not self.tools_list_loading
+        for iid, values in rows:
+            if listbox.exists(iid):
+                listbox.item(iid, values=values)
+            elif append_new:
+                listbox.insert("", "end", iid=iid, values=values)
+        for iid in deleted:
+            if listbox.exists(iid):
+                listbox.delete(iid)
 
         
     
     def return_tool(self):
+        # Fetch borrowed tools (tools where status is 'borrowed') in the background
+        self.worker.submit(
+            self.db.fetch_tools_by_status, 'borrowed', self.user_id,  # only this user's tools
+            on_success=self.prompt_return,
+            on_error=lambda e: messagebox.showerror("Error", f"An error occurred while returning the tool: {e}")
+        )
+
+    def prompt_return(self, borrowed_tools):
         try:
-            # Fetch borrowed tools (tools where status is 'borrowed')
-            borrowed_tools = self.db._execute_query(
-                "SELECT tool_id, name, status FROM tools WHERE status = 'borrowed' AND user_id = ?",
-                params=(self.user_id,),  # Make sure to filter by the user_id
-                fetch=True
-            )
             print(f"Borrowed tools: {borrowed_tools}")
 
             if not borrowed_tools:
@@ -607,15 +788,18 @@ class ToolManagementApp:
 
             if tool_name and tool_name in tool_names:
                 tool_id = borrowed_tools[tool_names.index(tool_name)][0]
-                self.db.return_tool(tool_id)
-                # Update the tool's status to 'available' upon return
-                self.db._execute_query(
-                    "UPDATE tools SET status = 'available' WHERE tool_id = ?",
-                    params=(tool_id,)
-                )
-                messagebox.showinfo("Tool Returned", f"'{tool_name}' has been returned.")
-                self.update_inventory_table()  # Update inventory display
-                self.update_pie_chart()  # Update pie chart
+
+                def returned(ok):
+                    if ok:
+                        messagebox.showinfo("Tool Returned", f"'{tool_name}' has been returned.")
+                        self.update_inventory_table()  # Update inventory display and pie chart
+                    else:
+                        messagebox.showerror("Error", f"Failed to return '{tool_name}'.")
+
+                # return_tool also marks the tool available again
+                today = datetime.date.today().isoformat()
+                self.worker.submit(self.db.return_tool, tool_id, self.user_id, today, on_success=returned,
+                                   on_error=lambda e: messagebox.showerror("Error", f"An error occurred while returning the tool: {e}"))
             else:
                 messagebox.showerror("Invalid Tool", "The selected tool is not valid for return.")
         except Exception as e:
@@ -626,12 +810,15 @@ class ToolManagementApp:
         tool_name = simpledialog.askstring("Search Tool", "Enter the name of the tool you want to search:")
 
         if tool_name:
-            tools = self.db.search_tool(tool_name)
-            if tools:
-                tool_list = '\n'.join([f"{tool[1]}: {tool[2]}" for tool in tools])
-                messagebox.showinfo("Search Results", f"Found tools: \n{tool_list}")
-            else:
-                messagebox.showinfo("Search Results", "No tools found.")
+            def found(tools):
+                if tools:
+                    tool_list = '\n'.join([f"{tool[1]}: {tool[2]}" for tool in tools])
+                    messagebox.showinfo("Search Results", f"Found tools: \n{tool_list}")
+                else:
+                    messagebox.showinfo("Search Results", "No tools found.")
+
+            self.worker.submit(self.db.search_tool, tool_name, on_success=found,
+                               on_error=lambda e: messagebox.showerror("Error", f"Search failed: {e}"))
                 
     def add_tool(self):
         # Create a Toplevel window for the add tool popup
@@ -639,6 +826,7 @@ class ToolManagementApp:
         add_tool_window.geometry("400x400")  # Adjusted height to accommodate location field
         add_tool_window.title("Add New Tool")
         add_tool_window.attributes('-topmost', True)  # Keep the window always on top
+        scope = self.worker.scope_for(add_tool_window)
         
         # Create a frame for the add tool form
         add_tool_frame = ctk.CTkFrame(add_tool_window)
@@ -691,23 +879,32 @@ class ToolManagementApp:
                 messagebox.showerror("Error", "Quantity must be a number.")
                 return
 
-            # Check if the tool already exists in the database
-            if self.db.fetch_tool_by_name(tool_name):
-                messagebox.showwarning("Duplicate Tool", "A tool with this name already exists.")
-                return
-
-            # Insert tool into the database
-            try:
+            def insert():
+                # Check if the tool already exists in the database
+                if self.db.fetch_tool_by_name(tool_name):
+                    return None
                 # Insert the tool using the insert_tool method of the database
-                if self.db.insert_tool(tool_name, tool_category, tool_condition, int(tool_quantity), tool_location):
+                return self.db.insert_tool(tool_name, tool_category, tool_condition, int(tool_quantity), tool_location)
+
+            def saved(result):
+                save_button.configure(state="normal")
+                if result is None:
+                    messagebox.showwarning("Duplicate Tool", "A tool with this name already exists.")
+                elif result:
                     messagebox.showinfo("Success", f"{tool_name} added successfully.")
                     add_tool_window.destroy()  # Close the popup
                     self.update_inventory_table()  # Update the inventory table
                 else:
                     messagebox.showerror("Error", "Failed to add tool. Please try again.")
-            except Exception as e:
+
+            def failed(e):
+                save_button.configure(state="normal")
                 messagebox.showerror("Error", f"Failed to add tool: {e}")
 
+            # Insert tool into the database
+            save_button.configure(state="disabled")
+            self.worker.submit(insert, on_success=saved, on_error=failed, scope=scope)
+
 
         # Save Button
         save_button = ctk.CTkButton(add_tool_frame, text="Save", command=save_tool)
@@ -726,12 +923,46 @@ class ToolManagementApp:
 
 
 
+    def show_busy(self, busy):
+        self.status_label.configure(text="Loading..." if busy else "")
+
+    def clear_busy_indicator(self):
+        if self.worker.on_busy == self.show_busy:
+            self.worker.on_busy = None
+
     def logout(self):
+        # The database, worker and caches stay open in the context for the next login
+        self.unsubscribe()
+        self.clear_busy_indicator()
+        self.worker.detach()
+        if self.pie_chart_after is not None:
+            self.window.after_cancel(self.pie_chart_after)
+        if self.pie_chart is not None:
+            self.pie_chart.close()
+            self.pie_chart = None
+        self.logged_out = True
         self.window.destroy()
-        LoginApp(self.db_path)
+
+
+def main(db_path='./db/inventory.db', server_url=None):
+    """Alternate between the login screen and the dashboard until a window is closed.
+
+    With server_url (or $LMS_SERVER), e.g. http://lab-pc:8765, the data comes
+    from a shared server.py instead of the local database file.
+    """
+    context = AppContext(db_path, max_changes=MAX_PATCHED_CHANGES,
+                         server_url=server_url or os.environ.get("LMS_SERVER"))
+    try:
+        while True:
+            login = LoginApp(context)
+            if login.user_id is None:
+                break
+            if not ToolManagementApp(login.user_id, context).logged_out:
+                break
+    finally:
+        context.close()
 
 
 if __name__ == '__main__':
-    db_path = './db/inventory.db'
-    LoginApp(db_path)
+    main()
 
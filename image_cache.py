@@ -0,0 +1,72 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Pre-scaled copies of the GUI images, named <stem>_<width>x<height>_<mtime>_<bytes>.<ext>
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "images")
+
+
+class ImageCache:
+    """Pre-scaled images for the GUI, kept on disk and in memory.
+
+    The scaled copy is stored under cache_dir, keyed by the source's mtime
+    and size and the target size, so later starts decode a small file
+    instead of the full-size original; within a process each image is
+    decoded once.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._loaded = {}
+
+    def load(self, path, size):
+        """Return the image at path scaled to size (width, height)."""
+        from PIL import Image
+
+        cached = _cache_path(self.cache_dir, path, size)
+        image = self._loaded.get(cached)
+        if image is None:
+            try:
+                image = Image.open(cached)
+                image.load()
+            except OSError:
+                image = _scale(path, size, cached)
+            self._loaded[cached] = image
+        return image
+
+
+def _cache_path(cache_dir, path, size):
+    stat = os.stat(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    ext = "png" if path.lower().endswith(".png") else "jpg"
+    return os.path.join(cache_dir, f"{stem}_{size[0]}x{size[1]}_{stat.st_mtime_ns}_{stat.st_size}.{ext}")
+
+
+def _scale(path, size, cached):
+    from PIL import Image
+
+    with Image.open(path) as source:
+        source.draft(source.mode, size)  # JPEG only: decode at a reduced scale when possible
+        image = source.resize(size, Image.LANCZOS)
+    try:
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        _remove_stale(cached)
+        partial = cached + ".part"
+        image.save(partial, format="PNG" if cached.endswith(".png") else "JPEG", quality=90)
+        os.replace(partial, cached)
+    except OSError as e:
+        logger.warning(f"Could not cache scaled image {cached}: {e}")
+    return image
+
+
+def _remove_stale(cached):
+    """Delete older copies of the same image and size left behind by a changed source."""
+    cache_dir, name = os.path.split(cached)
+    prefix = name[:name.rindex("_", 0, name.rindex("_"))] + "_"
+    for entry in os.listdir(cache_dir):
+        if entry.startswith(prefix) and entry != name and entry.count("_") == name.count("_"):
+            try:
+                os.remove(os.path.join(cache_dir, entry))
+            except OSError:
+                pass
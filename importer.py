@@ -0,0 +1,95 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from database import DatabaseManager
+from colorama import Fore, Style, init
+
+init(autoreset=True)
+
+
+def iter_csv(handle):
+    """Yield one dict per CSV row, keyed by the header line."""
+    yield from csv.DictReader(handle)
+
+
+def iter_jsonl(handle):
+    """Yield the value of each non-blank JSONL line; unparsable lines yield the raw text.
+
+    Values that are not objects are passed on as they are; bulk_import rejects them.
+    """
+    for line in handle:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield {"_raw": line}
+
+
+def detect_format(path, explicit=None):
+    if explicit:
+        return explicit
+    return "jsonl" if path.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+class RejectWriter:
+    """Appends rejected records with their row number and reason as JSONL."""
+
+    def __init__(self, path):
+        self.path = path
+        self.handle = None
+        self.count = 0
+
+    def __call__(self, row_number, record, error):
+        if self.handle is None:
+            self.handle = open(self.path, "w", encoding="utf-8")
+        self.handle.write(json.dumps({"row": row_number, "error": error, "record": record}) + "\n")
+        self.count += 1
+
+    def close(self):
+        if self.handle:
+            self.handle.close()
+
+
+def run_import(db, table, path, fmt=None, chunk_size=5000, rejects_path=None):
+    """Stream path into table and return the bulk_import stats."""
+    fmt = detect_format(path, fmt)
+    rejects = RejectWriter(rejects_path or f"{path}.rejects.jsonl")
+    with open(path, newline="", encoding="utf-8") as handle:
+        records = iter_jsonl(handle) if fmt == "jsonl" else iter_csv(handle)
+        try:
+            stats = db.bulk_import(table, records, chunk_size=chunk_size, on_reject=rejects)
+        finally:
+            rejects.close()
+    stats["rejects_path"] = rejects.path if rejects.count else None
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import tools or transactions from CSV/JSONL.")
+    parser.add_argument("table", choices=["tools", "transactions"])
+    parser.add_argument("path", help="CSV or JSONL file to import")
+    parser.add_argument("--db", default=os.path.join("db", "inventory.db"), help="database path")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="input format (default: from extension)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per transaction")
+    parser.add_argument("--rejects", help="where to write rejected rows (default: <path>.rejects.jsonl)")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db)
+    try:
+        stats = run_import(db, args.table, args.path, args.format, args.chunk_size, args.rejects)
+    finally:
+        db.close()
+
+    print(Fore.GREEN + f"Imported {stats['imported']} rows in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_sec']:.0f} rows/sec)." + Style.RESET_ALL)
+    if stats["rejected"]:
+        print(Fore.YELLOW + f"{stats['rejected']} rows rejected, see {stats['rejects_path']}" + Style.RESET_ALL)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
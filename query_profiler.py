@@ -0,0 +1,232 @@
+import re
+import sqlite3
+import time
+from collections import namedtuple
+from contextlib import closing
+
+# One line of EXPLAIN QUERY PLAN; table is the real table behind the alias, full_scan
+# is True when every row of it (or of one of its indexes) is visited.
+PlanStep = namedtuple("PlanStep", ["id", "parent", "detail", "table", "full_scan"])
+
+PROGRESS_STEPS = 1000  # VM instructions between progress handler calls
+READ_ONLY_KEYWORDS = ("select", "with", "values", "explain")
+
+_STEP_RE = re.compile(r"^(SCAN|SEARCH) (?:TABLE )?(?:\w+\.)?(\w+)(?: AS (\w+))?", re.IGNORECASE)
+_AUTOMATIC_RE = re.compile(r"AUTOMATIC (?:PARTIAL )?(?:COVERING )?INDEX \((.*?)\)", re.IGNORECASE)
+_SOURCE_RE = re.compile(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_CLAUSE_END = r"(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|\bHAVING\b|\bWINDOW\b|$)"
+_WHERE_RE = re.compile(r"\bWHERE\b(.*?)" + _CLAUSE_END, re.IGNORECASE | re.DOTALL)
+_ORDER_RE = re.compile(r"\bORDER\s+BY\b(.*?)(?=\bLIMIT\b|$)", re.IGNORECASE | re.DOTALL)
+_NOT_ALIASES = {"where", "on", "join", "left", "right", "inner", "outer", "cross", "natural", "group", "order",
+                "limit", "set", "using", "values", "select", "union", "having", "window", "as", "indexed", "not"}
+
+
+def is_read_only(sql):
+    """True if sql can run on a query_only reader connection."""
+    words = sql.lstrip(" \t\r\n(").split(None, 1)
+    if not words:
+        return False
+    keyword = words[0].lower()
+    return keyword in READ_ONLY_KEYWORDS or (keyword == "pragma" and "=" not in sql)
+
+
+def table_aliases(sql):
+    """Map each alias (and table name) used in sql to its table, lower-cased."""
+    aliases = {}
+    for table, alias in _SOURCE_RE.findall(sql):
+        table = table.lower()
+        aliases[table] = table
+        if alias and alias.lower() not in _NOT_ALIASES:
+            aliases[alias.lower()] = table
+    return aliases
+
+
+def explain(conn, sql):
+    """Return the statement's EXPLAIN QUERY PLAN as PlanSteps, or [] if it has none."""
+    if sql.lstrip().lower().startswith("explain"):
+        return []
+    with closing(conn.cursor()) as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql)
+        rows = cursor.fetchall()
+    aliases = table_aliases(sql)
+    plan = []
+    for step_id, parent, _, detail in rows:
+        table, full_scan = None, False
+        match = _STEP_RE.match(detail)
+        if match and (match.group(3) or match.group(2)).lower() in aliases:
+            table = aliases[(match.group(3) or match.group(2)).lower()]
+            # A scan visits every row; so does building an automatic index
+            full_scan = match.group(1).upper() == "SCAN" or "AUTOMATIC" in detail.upper()
+        plan.append(PlanStep(step_id, parent, detail, table, full_scan))
+    return plan
+
+
+def table_rows(conn, table):
+    """Estimated row count of table without reading it: sqlite_stat1 after ANALYZE, otherwise the
+    highest rowid (exact until rows are deleted). None if neither is available."""
+    with closing(conn.cursor()) as cursor:
+        try:
+            cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = ? LIMIT 1", (table,))
+            row = cursor.fetchone()
+            if row and row[0]:
+                return int(row[0].split()[0])
+        except sqlite3.OperationalError:
+            pass  # no sqlite_stat1 before the first ANALYZE
+        try:
+            cursor.execute(f'SELECT MAX(rowid) FROM "{table}"')
+            return cursor.fetchone()[0] or 0
+        except sqlite3.OperationalError:
+            return None  # WITHOUT ROWID table, CTE or view: not worth a COUNT(*) before the real query
+
+
+def _indexed_prefixes(conn, table):
+    """Leading columns of the table's existing indexes as (name, [columns]), rowid alias included."""
+    indexes = [("PRIMARY KEY", [row[1].lower()]) for row in conn.execute(f'PRAGMA table_info("{table}")')
+               if row[5] == 1 and row[2].upper() == "INTEGER"]
+    for row in conn.execute(f'PRAGMA index_list("{table}")').fetchall():
+        columns = [info[2].lower() for info in conn.execute(f'PRAGMA index_info("{row[1]}")') if info[2]]
+        indexes.append((row[1], columns))
+    return indexes
+
+
+def _referenced(clause, names, columns, ambiguous, pattern):
+    """Columns that clause compares with pattern, in order of appearance.
+
+    names are the table's name and aliases; an unqualified column that
+    exists in more than one of the query's tables is skipped.
+    """
+    found = []
+    for match in re.finditer(r"(?:\b(\w+)\.)?\b(\w+)\s*" + pattern, clause, re.IGNORECASE):
+        qualifier, column = (match.group(1) or "").lower(), match.group(2).lower()
+        if column not in columns or column in found:
+            continue
+        if (qualifier and qualifier not in names) or (not qualifier and column in ambiguous):
+            continue
+        found.append(column)
+    return found
+
+
+def suggest_indexes(conn, sql, plan):
+    """Suggest a CREATE INDEX (or ANALYZE) for each fully scanned table the query filters or sorts on."""
+    aliases = table_aliases(sql)
+    columns = {table: [row[1].lower() for row in conn.execute(f'PRAGMA table_info("{table}")')]
+               for table in set(aliases.values())}
+    seen, ambiguous = set(), set()
+    for table_columns in columns.values():
+        ambiguous.update(seen.intersection(table_columns))
+        seen.update(table_columns)
+    where = " ".join(_WHERE_RE.findall(sql))
+    order = " ".join(_ORDER_RE.findall(sql))
+    temp_sort = any("TEMP B-TREE FOR ORDER BY" in step.detail.upper() for step in plan)
+
+    suggestions = []
+    for step in plan:
+        if not step.full_scan:
+            continue
+        names = {name for name, table in aliases.items() if table == step.table}
+        automatic = _AUTOMATIC_RE.search(step.detail)
+        if automatic:
+            # SQLite builds this index for every run of the query; the join wants a permanent one
+            wanted = [term.split("=")[0].strip().lower() for term in automatic.group(1).split(" AND ")]
+        else:
+            table_columns = columns[step.table]
+            equality = _referenced(where, names, table_columns, ambiguous, r"(?:==?|\bIN\b|\bIS\b(?!\s+NOT))")
+            ranges = [column for column in _referenced(where, names, table_columns, ambiguous,
+                                                       r"(?:<=?|>=?|\bBETWEEN\b)") if column not in equality]
+            wanted = equality + ranges[:1]
+            if not wanted and temp_sort:
+                wanted = _referenced(order, names, table_columns, ambiguous, r"(?=,|\bASC\b|\bDESC\b|$)")
+        if not wanted:
+            continue
+        existing = next((name for name, prefix in _indexed_prefixes(conn, step.table)
+                         if prefix[:len(wanted)] == wanted), None)
+        if existing:
+            suggestion = (f"ANALYZE {step.table};  -- {existing} already covers ({', '.join(wanted)}) "
+                          f"but the planner did not pick it")
+        else:
+            suggestion = f"CREATE INDEX idx_{step.table}_{'_'.join(wanted)} ON {step.table}({', '.join(wanted)});"
+        if suggestion not in suggestions:
+            suggestions.append(suggestion)
+    return suggestions
+
+
+class QueryProfiler:
+    """Runs console SQL with its plan, timings and an estimate of the rows it scans.
+
+    Python's sqlite3 has no per-statement scan counters, so the work done is
+    measured in VM instructions through the progress handler, statements
+    (including trigger steps) are counted with the trace callback, and rows
+    scanned are estimated from the plan: each full scan visits its whole
+    table, so the table's estimated row count is added (an upper bound with
+    a LIMIT). The estimate never reads the table, so profiling a careless
+    full scan does not run it twice; rows_scanned is None when a scanned
+    table has no cheap estimate.
+    """
+
+    def __init__(self, db, fetch_size=200):
+        self.db = db
+        self.fetch_size = fetch_size
+
+    def run(self, sql, stats):
+        """Execute sql and yield its rows in batches, filling stats as it goes.
+
+        stats gets plan, columns, read_only and suggestions before the first
+        batch, and rows_returned, wall_ms, first_row_ms, vm_steps,
+        statements, rows_scanned (None if unknown) and rows_affected once the generator ends
+        or is closed. Time spent by the caller between batches (paging) is
+        not counted.
+        """
+        read_only = is_read_only(sql)
+        stats.update(read_only=read_only, rows_returned=0, wall_ms=0.0, first_row_ms=None,
+                     vm_steps=0, statements=0, rows_scanned=0, rows_affected=None)
+        connection = self.db._history_reader() if read_only else self.db._writer()
+        with connection as conn:
+            try:
+                plan = explain(conn, sql)
+            except Exception:
+                plan = []  # statements such as PRAGMA have no plan
+            stats["plan"] = plan
+            stats["suggestions"] = suggest_indexes(conn, sql, plan)
+            counts = [table_rows(conn, table) for table in {s.table for s in plan if s.full_scan}]
+            stats["rows_scanned"] = None if None in counts else sum(counts)
+
+            steps, traced = [0], []
+
+            def on_progress():
+                steps[0] += 1
+                return 0
+
+            conn.set_progress_handler(on_progress, PROGRESS_STEPS)
+            conn.set_trace_callback(traced.append)
+            elapsed = 0.0
+            try:
+                with closing(conn.cursor()) as cursor:
+                    started = time.perf_counter()
+                    cursor.execute(sql)
+                    elapsed += time.perf_counter() - started
+                    stats["columns"] = [d[0] for d in cursor.description] if cursor.description else []
+                    if not read_only:
+                        started = time.perf_counter()
+                        conn.commit()
+                        elapsed += time.perf_counter() - started
+                        stats["rows_affected"] = cursor.rowcount
+                    while cursor.description:
+                        started = time.perf_counter()
+                        rows = cursor.fetchmany(self.fetch_size)
+                        elapsed += time.perf_counter() - started
+                        if stats["first_row_ms"] is None:
+                            stats["first_row_ms"] = elapsed * 1000
+                        if not rows:
+                            break
+                        stats["rows_returned"] += len(rows)
+                        yield rows
+            except BaseException:
+                if not read_only:
+                    conn.rollback()
+                raise
+            finally:
+                conn.set_progress_handler(None, 0)
+                conn.set_trace_callback(None)
+                stats["wall_ms"] = elapsed * 1000
+                stats["vm_steps"] = steps[0] * PROGRESS_STEPS
+                stats["statements"] = len([s for s in traced if s.strip().upper() not in ("BEGIN", "COMMIT")])
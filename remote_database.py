@@ -0,0 +1,227 @@
+import http.client
+import json
+import logging
+import threading
+from urllib.parse import urlencode, urlsplit
+from database import BatchResult, OPERATION_FIELDS, validate_tool_row
+
+logger = logging.getLogger(__name__)
+
+
+class RemoteDatabase:
+    """DatabaseManager look-alike that talks to server.py over HTTP.
+
+    The GUI and the scripted CLI call the same methods with the same
+    arguments and get the same shapes back (rows as tuples, keyset keys as
+    tuples), so either can switch between a local file and a shared server.
+    Each thread keeps its own keep-alive connection. get_user keeps the
+    login token the server hands out and sends it with every request; if
+    the session has expired the client logs in again once and retries.
+    Client errors (4xx) raise ValueError like the local validation does;
+    server errors raise RuntimeError.
+    """
+
+    is_memory = False
+    is_remote = True
+
+    def __init__(self, base_url, timeout=30.0):
+        url = urlsplit(base_url if "://" in base_url else "http://" + base_url)
+        if url.scheme != "http":
+            raise ValueError(f"Only http:// servers are supported, got {base_url!r}.")
+        self.db_path = f"http://{url.netloc}"
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._token = None
+        self._credentials = None
+
+    # -- transport -------------------------------------------------------
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _request(self, method, path, params=None, body=None, relogin=True):
+        if params:
+            params = {name: value for name, value in params.items() if value is not None}
+            path += "?" + urlencode(params)
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        if self._token:
+            headers["Authorization"] = f"Bearer {self._token}"
+        for attempt in range(2):
+            conn = self._connection()
+            reused = conn.sock is not None
+            try:
+                conn.request(method, path, body=payload, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (ConnectionError, http.client.BadStatusLine, http.client.CannotSendRequest) as e:
+                conn.close()
+                # A kept-alive connection may have been closed by the server while idle; retry once fresh
+                if not reused or attempt:
+                    raise RuntimeError(f"Cannot reach {self.db_path}: {e}")
+        if response.getheader("Connection", "").lower() == "close":
+            conn.close()
+        result = json.loads(data) if data else {}
+        if response.status == 401 and relogin and self._credentials:
+            # The session expired (or the server restarted); log in again and retry once
+            self.get_user(*self._credentials)
+            return self._request(method, path, body=body, relogin=False)
+        if response.status >= 400:
+            error = result.get("error", response.reason) if isinstance(result, dict) else response.reason
+            if response.status < 500:
+                raise ValueError(error)
+            raise RuntimeError(f"{method} {path} failed: {error}")
+        return result
+
+    def _get(self, path, **params):
+        return self._request("GET", path, params)
+
+    def _post(self, path, body=None):
+        return self._request("POST", path, body=body if body is not None else {})
+
+    # -- users -----------------------------------------------------------
+
+    def get_user(self, username, password):
+        result = self._post("/login", {"username": username, "password": password})
+        # A failed login also drops the previous session, as logging in as someone else would
+        self._token = result.get("token")
+        self._credentials = (username, password) if self._token else None
+        return [tuple(row) for row in result["user"]]
+
+    def insert_user(self, username, password, name, age, email):
+        return self._post("/users", {"username": username, "password": password, "name": name,
+                                     "age": age, "email": email})["ok"]
+
+    # -- tools -----------------------------------------------------------
+
+    def _page(self, result):
+        next_key = result["next"]
+        return [tuple(row) for row in result["rows"]], tuple(next_key) if isinstance(next_key, list) else next_key
+
+    def fetch_tools_page(self, columns=None, where=None, order_by="tool_id", descending=False,
+                         after=None, limit=500, offset=0):
+        if where is not None and not isinstance(where, dict):
+            raise ValueError("A remote database only accepts where as a {column: value} dict.")
+        return self._page(self._get("/tools", columns=",".join(columns) if columns else None,
+                                    where=json.dumps(where) if where else None, order_by=order_by,
+                                    descending="1" if descending else None,
+                                    after=json.dumps(after) if after is not None else None,
+                                    limit=limit, offset=offset or None))
+
+    def iter_tools(self, columns=None, where=None, order_by="tool_id", descending=False, page_size=500):
+        after = None
+        while True:
+            rows, after = self.fetch_tools_page(columns, where, order_by, descending, after, page_size)
+            yield from rows
+            if after is None:
+                return
+
+    def filter_tools(self, condition=None, category=None, name_prefix=None, status=None,
+                     columns=None, after=None, limit=200):
+        if not any((condition, category, name_prefix, status)):
+            return self.fetch_tools_page(columns, after=after, limit=limit)
+        return self._page(self._get("/tools", condition=condition, category=category, name_prefix=name_prefix,
+                                    status=status, columns=",".join(columns) if columns else None,
+                                    after=json.dumps(after) if after is not None else None, limit=limit))
+
+    def filter_options(self):
+        return self._get("/tools/filter-options")
+
+    def count_tools(self):
+        return self._get("/tools/count")["count"]
+
+    def category_counts(self):
+        return self._get("/tools/categories")
+
+    def status_counts(self):
+        return self._get("/tools/statuses")
+
+    def search_tool(self, keyword, limit=50, offset=0):
+        return [tuple(row) for row in self._get("/tools/search", q=keyword, limit=limit, offset=offset)["rows"]]
+
+    def fetch_tool_by_name(self, name):
+        return [tuple(row) for row in self._get("/tools/by-name", name=name)["rows"]]
+
+    def fetch_tools_by_status(self, status, user_id=None):
+        return [tuple(row) for row in self._get("/tools/by-status", status=status, user_id=user_id)["rows"]]
+
+    def insert_tool(self, name, category, condition, quantity, location):
+        # Invalid fields raise ValueError here, as they do locally; only a failed insert returns False
+        row = validate_tool_row({"name": name, "category": category, "condition": condition,
+                                 "quantity": quantity, "location": location})
+        try:
+            return self._post("/tools", dict(zip(("name", "category", "condition", "quantity", "location"), row)))["ok"]
+        except ValueError as e:
+            logger.error(f"Error inserting tool: {e}")
+            return False
+
+    def delete_tool(self, tool_id):
+        self._request("DELETE", f"/tools/{int(tool_id)}")
+
+    def borrow_tool(self, tool_id, user_id, borrower_name, borrow_date):
+        self._post(f"/tools/{int(tool_id)}/borrow", {"user_id": user_id, "borrower": borrower_name,
+                                                     "date": borrow_date})
+
+    def return_tool(self, tool_id, user_id, return_date):
+        try:
+            return self._post(f"/tools/{int(tool_id)}/return", {"user_id": user_id, "date": return_date})["ok"]
+        except ValueError:
+            return False  # not currently borrowed
+
+    # -- changes and history ---------------------------------------------
+
+    def change_version(self):
+        return self._get("/changes/version")["version"]
+
+    def tool_changes_since(self, version, columns=None, max_changes=None):
+        result = self._get("/changes", since=version, max=max_changes, columns=",".join(columns) if columns else None)
+        rows = [tuple(row) for row in result["changed"]] if result["changed"] is not None else None
+        return result["version"], rows, result["deleted"]
+
+    def tool_change_ids_since(self, version, max_changes=None):
+        result = self._get("/changes", since=version, max=max_changes, ids_only="1")
+        return result["version"], result["changed"], result["deleted"]
+
+    def fetch_transactions_page(self, since=None, tool_id=None, user_id=None, after=None, limit=1000):
+        result = self._get("/transactions", since=since, tool_id=tool_id, user_id=user_id, after=after, limit=limit)
+        return [tuple(row) for row in result["rows"]], result["next"]
+
+    def iter_transactions(self, since=None, tool_id=None, user_id=None, batch_size=1000, after=None):
+        while True:
+            rows, after = self.fetch_transactions_page(since, tool_id, user_id, after, batch_size)
+            yield from rows
+            if after is None:
+                return
+
+    def apply_operations(self, operations):
+        records = [dict(zip(OPERATION_FIELDS[op], args), op=op) for op, args in operations]
+        result = self._post("/operations", {"operations": records})
+        return [BatchResult(*item) for item in result["results"]]
+
+    # -- server ----------------------------------------------------------
+
+    def batch(self, requests):
+        """Send [(method, path, body), ...] in one round trip; returns [(status, body), ...]."""
+        result = self._post("/batch", {"requests": [{"method": method, "path": path, "body": body}
+                                                    for method, path, body in requests]})
+        return [(item["status"], item["body"]) for item in result["responses"]]
+
+    def metrics(self):
+        return self._get("/metrics")
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
@@ -0,0 +1,117 @@
+import csv
+import datetime
+import json
+import queue
+import threading
+import time
+from database import validate_operation
+
+# Positional fields for comma-separated lines, after the operation name
+FIELDS = {
+    "borrow": ("tool_id", "borrower", "date", "user_id"),
+    "return": ("tool_id", "date", "user_id"),
+    "add": ("name", "category", "condition", "quantity", "location"),
+}
+
+
+def parse_line(line):
+    """Turn 'borrow,12,Juan' or '{"op": "borrow", "tool_id": 12, ...}' into a record dict."""
+    line = line.strip()
+    if line.startswith("{"):
+        return json.loads(line)
+    values = next(csv.reader([line]))
+    op = values[0].strip().lower() if values else ""
+    record = {"op": op}
+    record.update(zip(FIELDS.get(op, ()), (value.strip() for value in values[1:])))
+    return record
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values), max(1, int(round(pct / 100.0 * len(sorted_values))))) - 1]
+
+
+def _read_lines(handle, lines):
+    for number, line in enumerate(handle, start=1):
+        lines.put((number, line, time.perf_counter()))
+    lines.put(None)
+
+
+def run_replay(db, handle, user_id, batch_size=500, max_delay=0.25, on_reject=None):
+    """Apply the operations read from handle, grouped into transactions.
+
+    A transaction is committed once it holds batch_size operations or its
+    oldest operation has waited max_delay seconds, whichever comes first, so
+    a slow stream (a scanner on stdin) is still committed promptly while a
+    file is applied in large batches. Bad lines and operations that cannot
+    apply go to on_reject(line_number, line, error). Returns a stats dict.
+    """
+    lines = queue.Queue(maxsize=batch_size * 4)
+    threading.Thread(target=_read_lines, args=(handle, lines), name="lms-replay-reader", daemon=True).start()
+
+    stats = {"applied": 0, "rejected": 0, "transactions": 0}
+    commit_ms, latency_ms = [], []
+    batch, deadline, done = [], None, False
+    started = time.perf_counter()
+
+    def reject(number, line, error):
+        stats["rejected"] += 1
+        if on_reject is not None:
+            on_reject(number, line.rstrip("\n"), error)
+
+    def flush():
+        begun = time.perf_counter()
+        results = db.apply_operations([(op, args) for _, _, op, args, _ in batch])
+        committed = time.perf_counter()
+        stats["transactions"] += 1
+        commit_ms.append((committed - begun) * 1000)
+        for (number, line, _, _, arrived), result in zip(batch, results):
+            if result.ok:
+                stats["applied"] += 1
+                latency_ms.append((committed - arrived) * 1000)
+            else:
+                reject(number, line, result.error)
+        batch.clear()
+
+    while not done:
+        timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+        try:
+            item = lines.get(timeout=timeout)
+        except queue.Empty:
+            item = ()  # the oldest pending operation has waited long enough
+        if item is None:
+            done = True
+        elif item:
+            number, line, arrived = item
+            if line.strip() and not line.lstrip().startswith("#"):
+                try:
+                    op, args = validate_operation(parse_line(line), user_id,
+                                                  datetime.datetime.now().isoformat(sep=" ", timespec="seconds"))
+                except (ValueError, TypeError, json.JSONDecodeError) as e:
+                    reject(number, line, str(e))
+                else:
+                    batch.append((number, line, op, args, arrived))
+                    if deadline is None:
+                        deadline = arrived + max_delay
+        # Past the deadline, still take whatever the reader has already queued
+        overdue = time.perf_counter() >= deadline if batch else False
+        if batch and (done or len(batch) >= batch_size or (overdue and lines.empty())):
+            flush()
+            deadline = None
+        elif not batch:
+            deadline = None
+
+    elapsed = time.perf_counter() - started
+    commit_ms.sort()
+    latency_ms.sort()
+    stats.update({
+        "elapsed_sec": round(elapsed, 3),
+        "ops_per_sec": round(stats["applied"] / elapsed, 1) if elapsed else 0.0,
+        "commit_p50_ms": round(percentile(commit_ms, 50), 3),
+        "commit_p95_ms": round(percentile(commit_ms, 95), 3),
+        "latency_p50_ms": round(percentile(latency_ms, 50), 3),
+        "latency_p95_ms": round(percentile(latency_ms, 95), 3),
+        "latency_p99_ms": round(percentile(latency_ms, 99), 3),
+    })
+    return stats
@@ -0,0 +1,599 @@
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import re
+import secrets
+import signal
+import sys
+import time
+from collections import deque
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+from async_database import AsyncDatabaseManager
+from database import BatchResult, TOOL_COLUMNS, validate_operation
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 1024 * 1024
+MAX_BATCH_REQUESTS = 100
+MAX_PAGE_SIZE = 1000  # larger limits are clamped; clients page on with the next key
+KEEP_ALIVE_TIMEOUT = 15.0  # seconds an idle keep-alive connection is kept open
+METRIC_SAMPLES = 2048  # latencies kept per endpoint for the percentiles
+MAX_HEADERS = 100
+SESSION_IDLE_TIMEOUT = 8 * 3600  # seconds a login token stays valid without being used
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class EndpointMetrics:
+    """Request count, errors and latency percentiles for one endpoint (recent requests only)."""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.samples = deque(maxlen=METRIC_SAMPLES)
+
+    def record(self, elapsed_ms, ok):
+        self.count += 1
+        self.errors += 0 if ok else 1
+        self.total_ms += elapsed_ms
+        self.samples.append(elapsed_ms)
+
+    def snapshot(self):
+        samples = sorted(self.samples)
+        pick = lambda pct: samples[min(len(samples) - 1, int(pct / 100.0 * len(samples)))] if samples else 0.0
+        return {"count": self.count, "errors": self.errors,
+                "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+                "p50_ms": round(pick(50), 3), "p95_ms": round(pick(95), 3), "p99_ms": round(pick(99), 3),
+                "max_ms": round(samples[-1], 3) if samples else 0.0}
+
+
+class WriteBatcher:
+    """Group commit for borrow, return and add requests.
+
+    Operations that arrive within window seconds of each other are applied
+    by one apply_operations call, i.e. one transaction with a savepoint per
+    operation, so many clients borrowing at once share a commit instead of
+    queueing for one each. Each caller still gets its own result.
+    """
+
+    def __init__(self, adb, window=0.002, max_batch=256):
+        self.adb = adb
+        self.window = window
+        self.max_batch = max_batch
+        self.pending = []
+        self.batches = 0
+        self.operations = 0
+        self._timer = None
+        self._flushing = set()
+
+    async def submit(self, op, args):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((op, args, future))
+        if len(self.pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self.pending = self.pending, []
+        if batch:
+            task = asyncio.ensure_future(self._apply(batch))
+            self._flushing.add(task)
+            task.add_done_callback(self._flushing.discard)
+
+    async def _apply(self, batch):
+        try:
+            results = await self.adb.apply_operations([(op, args) for op, args, _ in batch])
+        except Exception as e:
+            logger.error(f"Write batch of {len(batch)} failed: {e}")
+            results = [BatchResult(index, False, str(e)) for index in range(len(batch))]
+        self.batches += 1
+        self.operations += len(batch)
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def drain(self):
+        """Apply everything still waiting for its window."""
+        self._flush()
+        if self._flushing:
+            await asyncio.gather(*self._flushing)
+
+
+def _int(query, name, default=None):
+    value = query.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"Query parameter '{name}' must be an integer.")
+
+
+def _limit(query, default):
+    limit = _int(query, "limit", default)
+    if limit < 1:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Query parameter 'limit' must be at least 1.")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def _json_param(query, name):
+    value = query.get(name)
+    if value is None or value == "":
+        return None
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"Query parameter '{name}' must be JSON.")
+
+
+def _columns(query):
+    value = query.get("columns")
+    return tuple(value.split(",")) if value else None
+
+
+def _after(query, order_by):
+    """The keyset 'after' parameter as an (order value, tool_id) tuple; a bare tool_id when ordering by tool_id."""
+    value = _json_param(query, "after")
+    if value is None:
+        return None
+    if order_by == "tool_id" and isinstance(value, int) and not isinstance(value, bool):
+        return value, value
+    if not (isinstance(value, list) and len(value) == 2 and isinstance(value[1], int)
+            and not isinstance(value[1], bool)):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Query parameter 'after' must be the [value, tool_id] next key.")
+    return tuple(value)
+
+
+def _today():
+    return datetime.date.today().isoformat()
+
+
+def _bearer(headers):
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    return token.strip()
+
+
+def _public_user(row):
+    return [row[0], row[1], None] + list(row[3:])  # same shape as a users row, without the password
+
+
+class LMSServer:
+    """JSON over HTTP/1.1 in front of one AsyncDatabaseManager.
+
+    Connections are kept alive between requests; each is served by its own
+    task, reads run on the reader pool and writes go through the single
+    writer thread, with borrow/return/add grouped by a WriteBatcher.
+    POST /batch runs several requests in one round trip. Routes that change
+    data need the token POST /login hands out, sent as
+    "Authorization: Bearer <token>", and act as that user. shutdown() drains:
+    it stops accepting, closes idle connections, lets requests in flight
+    finish and flushes pending writes before closing the database.
+    """
+
+    def __init__(self, db_path, host="127.0.0.1", port=8765, readers=4, batch_window=0.002, max_batch=256,
+                 open_signup=False):
+        self.host = host
+        self.port = port
+        self.sessions = {}  # token -> [user_id, last used (monotonic)]
+        self.adb = AsyncDatabaseManager(db_path, readers=readers)
+        self.batcher = WriteBatcher(self.adb, batch_window, max_batch)
+        self.metrics = {}
+        self.started = time.time()
+        self.draining = False
+        self.in_flight = 0
+        self._idle = set()
+        self._connections = set()
+        self._server = None
+        # (method, path template, handler, needs a login token)
+        self.routes = [
+            ("GET", "/health", self.health, False),
+            ("GET", "/metrics", self.get_metrics, False),
+            ("POST", "/batch", self.batch, False),
+            ("POST", "/login", self.login, False),
+            ("POST", "/users", self.register, not open_signup),
+            ("GET", "/tools", self.list_tools, False),
+            ("POST", "/tools", self.add_tool, True),
+            ("GET", "/tools/count", self.count_tools, False),
+            ("GET", "/tools/categories", self.category_counts, False),
+            ("GET", "/tools/statuses", self.status_counts, False),
+            ("GET", "/tools/filter-options", self.filter_options, False),
+            ("GET", "/tools/search", self.search_tools, False),
+            ("GET", "/tools/by-name", self.tools_by_name, False),
+            ("GET", "/tools/by-status", self.tools_by_status, False),
+            ("DELETE", "/tools/{id}", self.delete_tool, True),
+            ("POST", "/tools/{id}/borrow", self.borrow_tool, True),
+            ("POST", "/tools/{id}/return", self.return_tool, True),
+            ("GET", "/changes", self.changes, False),
+            ("GET", "/changes/version", self.change_version, False),
+            ("GET", "/transactions", self.list_transactions, False),
+            ("POST", "/operations", self.apply_operations, True),
+        ]
+        # Templates double as the metrics keys; {id} matches a numeric path segment
+        self.routes = [(method, re.compile(re.escape(template).replace(r"\{id\}", r"(\d+)") + "$"), template,
+                        handler, auth) for method, template, handler, auth in self.routes]
+
+    # -- lifecycle ---------------------------------------------------------
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Listening on http://{self.host}:{self.port}")
+
+    async def shutdown(self, drain_timeout=10.0):
+        """Stop accepting, let requests in flight finish (up to drain_timeout) and close."""
+        if self.draining:
+            return
+        self.draining = True
+        logger.info(f"Draining {self.in_flight} request(s) in flight...")
+        self._server.close()
+        for writer in list(self._idle):
+            writer.close()  # nothing in progress on these; the client reconnects elsewhere
+        deadline = time.monotonic() + drain_timeout
+        while self.in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        await self.batcher.drain()
+        for writer in list(self._connections):
+            writer.close()
+        await self.adb.close()
+        logger.info("Server stopped.")
+
+    # -- HTTP ----------------------------------------------------------------
+
+    async def _serve_connection(self, reader, writer):
+        self._connections.add(writer)
+        try:
+            while not self.draining:
+                self._idle.add(writer)
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+                finally:
+                    self._idle.discard(writer)
+                if not request_line.strip():
+                    break
+                self.in_flight += 1
+                try:
+                    keep_alive = await self._serve_request(request_line, reader, writer)
+                finally:
+                    self.in_flight -= 1
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError:
+            # readline() raises this for a request or header line over the stream limit
+            try:
+                await self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Request line or header too long."},
+                                    False)
+            except ConnectionError:
+                pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _serve_request(self, request_line, reader, writer):
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            await self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request line."}, False)
+            return False
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                await self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Too many headers."}, False)
+                return False
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        connection = headers.get("connection", "").lower()
+        keep_alive = (version == "HTTP/1.1" and connection != "close") or connection == "keep-alive"
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            await self._respond(writer, HTTPStatus.LENGTH_REQUIRED, {"error": "Send a Content-Length body."}, False)
+            return False
+        length = headers.get("content-length") or "0"
+        if not (length.isascii() and length.isdigit()):
+            # The body cannot be framed, so the connection cannot be reused either
+            await self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Content-Length must be a number."}, False)
+            return False
+        length = int(length)
+        if length > MAX_BODY_BYTES:
+            await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request body too large."}, False)
+            return False
+        body = await reader.readexactly(length) if length else b""
+
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        status, payload = await self.dispatch(method.upper(), url.path, query, body, _bearer(headers))
+        keep_alive = keep_alive and not self.draining
+        await self._respond(writer, status, payload, keep_alive)
+        return keep_alive
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+        status = HTTPStatus(status)
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n")
+        if keep_alive:
+            head += f"Keep-Alive: timeout={int(KEEP_ALIVE_TIMEOUT)}\r\n"
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await writer.drain()
+
+    async def dispatch(self, method, path, query, body, token=None):
+        """Route one request and return (status, payload); also used for each part of a batch.
+
+        token is the caller's login token, if any; routes that need one get
+        the user it belongs to as user_id.
+        """
+        started = time.perf_counter()
+        # Unknown paths share one metrics entry so scanners cannot grow the table
+        name, status, handler, match, auth, path_known = "unmatched", HTTPStatus.OK, None, None, False, False
+        try:
+            for route_method, pattern, template, route_handler, route_auth in self.routes:
+                route_match = pattern.match(path)
+                if route_match:
+                    path_known = True
+                    if route_method == method:
+                        name, handler, match, auth = f"{method} {template}", route_handler, route_match, route_auth
+                        break
+            if handler is None:
+                raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED if path_known else HTTPStatus.NOT_FOUND,
+                                f"No route for {method} {path}.")
+            if self.draining and handler != self.health:
+                raise HttpError(HTTPStatus.SERVICE_UNAVAILABLE, "Server is shutting down.")
+            try:
+                data = json.loads(body) if body else {}
+            except json.JSONDecodeError:
+                raise HttpError(HTTPStatus.BAD_REQUEST, "Request body must be JSON.")
+            if not isinstance(data, dict):
+                raise HttpError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object.")
+            if auth:
+                payload = await handler(query, data, *match.groups(), user_id=self._session_user(token))
+            elif handler == self.batch:
+                payload = await handler(query, data, token=token)  # parts act as the batch's caller
+            else:
+                payload = await handler(query, data, *match.groups())
+        except HttpError as e:
+            status, payload = e.status, {"error": str(e)}
+        except ValueError as e:
+            status, payload = HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except Exception as e:
+            logger.exception(f"{name} failed")
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+        self.metrics.setdefault(name, EndpointMetrics()).record((time.perf_counter() - started) * 1000, status < 500)
+        return status, payload
+
+    # -- sessions ------------------------------------------------------------
+
+    def _session_user(self, token):
+        """Return the user_id token was issued to, refreshing it; HttpError 401 if unknown or expired."""
+        session = self.sessions.get(token) if token else None
+        now = time.monotonic()
+        if session is None or now - session[1] > SESSION_IDLE_TIMEOUT:
+            self.sessions.pop(token, None)
+            raise HttpError(HTTPStatus.UNAUTHORIZED, "Log in first (send Authorization: Bearer <token> from /login).")
+        session[1] = now
+        return session[0]
+
+    def _own(self, op, args, user_id):
+        """Reject a borrow/return recorded under someone other than the logged-in user."""
+        if op != "add" and args[1] != user_id:
+            raise HttpError(HTTPStatus.FORBIDDEN, "Borrow and return as the logged-in user only.")
+        return op, args
+
+    # -- handlers ------------------------------------------------------------
+
+    async def health(self, query, data):
+        return {"status": "draining" if self.draining else "ok"}
+
+    async def get_metrics(self, query, data):
+        return {"uptime_sec": round(time.time() - self.started, 1), "in_flight": self.in_flight,
+                "connections": len(self._connections),
+                "write_batches": {"batches": self.batcher.batches, "operations": self.batcher.operations,
+                                  "mean_size": round(self.batcher.operations / self.batcher.batches, 2)
+                                  if self.batcher.batches else 0.0},
+                "endpoints": {name: metrics.snapshot() for name, metrics in sorted(self.metrics.items())}}
+
+    async def batch(self, query, data, token=None):
+        requests = data.get("requests")
+        if not isinstance(requests, list) or len(requests) > MAX_BATCH_REQUESTS:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"Send {{'requests': [...]}} with at most {MAX_BATCH_REQUESTS} items.")
+        for index, item in enumerate(requests):
+            if not (isinstance(item, dict) and isinstance(item.get("path"), str)
+                    and isinstance(item.get("method", "GET"), str)):
+                raise HttpError(HTTPStatus.BAD_REQUEST,
+                                f"Request {index}: send {{'method': ..., 'path': ..., 'body': ...}}.")
+
+        async def one(item):
+            url = urlsplit(item["path"])
+            if url.path == "/batch":
+                return {"status": HTTPStatus.BAD_REQUEST, "body": {"error": "Batches cannot be nested."}}
+            query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            body = json.dumps(item["body"]).encode("utf-8") if item.get("body") is not None else b""
+            status, payload = await self.dispatch(item.get("method", "GET").upper(), url.path, query, body, token)
+            return {"status": int(status), "body": payload}
+
+        # Run together: reads share the pool and writes share a batcher commit
+        return {"responses": await asyncio.gather(*(one(item) for item in requests))}
+
+    async def login(self, query, data):
+        username, password = data.get("username", ""), data.get("password", "")
+        if not (isinstance(username, str) and isinstance(password, str)):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "username and password must be strings.")
+        user = await self.adb.get_user(username, password)
+        if not user:
+            return {"user": [], "token": None}
+        now = time.monotonic()
+        for token, (_, last_used) in list(self.sessions.items()):
+            if now - last_used > SESSION_IDLE_TIMEOUT:
+                del self.sessions[token]
+        token = secrets.token_urlsafe(32)
+        self.sessions[token] = [user[0][0], now]
+        return {"user": [_public_user(row) for row in user], "token": token}
+
+    async def register(self, query, data, user_id=None):
+        ok = await self.adb.insert_user(data.get("username"), data.get("password"), data.get("name"),
+                                        data.get("age"), data.get("email"))
+        return {"ok": ok}
+
+    async def list_tools(self, query, data):
+        filters = {name: query.get(name) for name in ("condition", "category", "status", "name_prefix")}
+        columns, limit, order_by = _columns(query), _limit(query, 200), query.get("order_by", "tool_id")
+        if any(filters.values()):
+            after = _after(query, "tool_id")
+            rows, next_key = await self.adb.filter_tools(columns=columns, after=after, limit=limit, **filters)
+        else:
+            if order_by not in TOOL_COLUMNS:
+                raise HttpError(HTTPStatus.BAD_REQUEST, f"Cannot order by '{order_by}'.")
+            after = _after(query, order_by)
+            where = _json_param(query, "where")
+            if where is not None and not isinstance(where, dict):
+                raise HttpError(HTTPStatus.BAD_REQUEST, "where must be a JSON object of column: value.")
+            rows, next_key = await self.adb.fetch_tools_page(columns, where, order_by, query.get("descending") == "1",
+                                                             after, limit, _int(query, "offset", 0))
+        return {"rows": rows, "next": next_key}
+
+    async def add_tool(self, query, data, user_id):
+        result = await self.batcher.submit(*validate_operation(dict(data, op="add"), None, None))
+        if not result.ok:
+            raise HttpError(HTTPStatus.CONFLICT, result.error)
+        return {"ok": True}
+
+    async def count_tools(self, query, data):
+        return {"count": await self.adb.count_tools()}
+
+    async def category_counts(self, query, data):
+        return await self.adb.category_counts()
+
+    async def status_counts(self, query, data):
+        return await self.adb.status_counts()
+
+    async def filter_options(self, query, data):
+        return await self.adb.filter_options()
+
+    async def search_tools(self, query, data):
+        return {"rows": await self.adb.search_tool(query.get("q", ""), _limit(query, 50),
+                                                   _int(query, "offset", 0))}
+
+    async def tools_by_name(self, query, data):
+        return {"rows": await self.adb.fetch_tool_by_name(query.get("name", ""))}
+
+    async def tools_by_status(self, query, data):
+        return {"rows": await self.adb.fetch_tools_by_status(query.get("status", ""), _int(query, "user_id"))}
+
+    async def delete_tool(self, query, data, tool_id, user_id):
+        try:
+            await self.adb.delete_tool(int(tool_id))
+        except ValueError as e:
+            raise HttpError(HTTPStatus.NOT_FOUND, str(e))
+        return {"ok": True}
+
+    async def borrow_tool(self, query, data, tool_id, user_id):
+        record = dict(data, op="borrow", tool_id=tool_id)
+        result = await self.batcher.submit(*self._own(*validate_operation(record, user_id, _today()), user_id))
+        if not result.ok:
+            raise HttpError(HTTPStatus.CONFLICT, result.error)
+        return {"ok": True}
+
+    async def return_tool(self, query, data, tool_id, user_id):
+        record = dict(data, op="return", tool_id=tool_id)
+        result = await self.batcher.submit(*self._own(*validate_operation(record, user_id, _today()), user_id))
+        if not result.ok:
+            raise HttpError(HTTPStatus.CONFLICT, result.error)
+        return {"ok": True}
+
+    async def changes(self, query, data):
+        since, max_changes = _int(query, "since", 0), _int(query, "max")
+        if query.get("ids_only") == "1":
+            latest, changed, deleted = await self.adb.tool_change_ids_since(since, max_changes)
+        else:
+            latest, changed, deleted = await self.adb.tool_changes_since(since, _columns(query), max_changes)
+        return {"version": latest, "changed": changed, "deleted": deleted}
+
+    async def change_version(self, query, data):
+        return {"version": await self.adb.change_version()}
+
+    async def list_transactions(self, query, data):
+        rows, next_key = await self.adb.fetch_transactions_page(query.get("since"), _int(query, "tool_id"),
+                                                                _int(query, "user_id"), _int(query, "after"),
+                                                                _limit(query, 1000))
+        return {"rows": rows, "next": next_key}
+
+    async def apply_operations(self, query, data, user_id):
+        operations = data.get("operations")
+        if not isinstance(operations, list):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Send {'operations': [{'op': ..., ...}, ...]}.")
+        # Checked like the single borrow/return/add requests; nothing is applied if any item is invalid
+        validated = []
+        for index, record in enumerate(operations):
+            try:
+                if not isinstance(record, dict):
+                    raise ValueError("Each operation must be an object with an 'op' field.")
+                validated.append(self._own(*validate_operation(record, user_id, _today()), user_id))
+            except ValueError as e:
+                raise HttpError(HTTPStatus.BAD_REQUEST, f"Operation {index}: {e}")
+        results = await self.adb.apply_operations(validated)
+        return {"results": [list(result) for result in results]}
+
+
+async def serve(db_path, host, port, readers=4, batch_window=0.002, drain_timeout=10.0, open_signup=False):
+    server = LMSServer(db_path, host, port, readers, batch_window, open_signup=open_signup)
+    await server.start()
+    print(f"Listening on http://{server.host}:{server.port}", flush=True)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass  # Windows: Ctrl+C raises KeyboardInterrupt instead
+    try:
+        await stop.wait()
+    finally:
+        await server.shutdown(drain_timeout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the inventory database as JSON over HTTP.")
+    parser.add_argument("--db", default=os.path.join("db", "inventory.db"), help="database path")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (0.0.0.0 for the whole network)")
+    parser.add_argument("--port", type=int, default=8765, help="port (0 picks a free one)")
+    parser.add_argument("--readers", type=int, default=4, help="reader connections")
+    parser.add_argument("--batch-window", type=float, default=0.002,
+                        help="seconds borrow/return/add requests wait to share a commit")
+    parser.add_argument("--drain-timeout", type=float, default=10.0,
+                        help="seconds to let requests in flight finish on shutdown")
+    parser.add_argument("--open-signup", action="store_true",
+                        help="let anyone create an account (by default only logged-in users can)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    logging.getLogger("database").setLevel(logging.WARNING)
+    try:
+        asyncio.run(serve(args.db, args.host, args.port, args.readers, args.batch_window, args.drain_timeout,
+                          args.open_signup))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
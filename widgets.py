@@ -0,0 +1,330 @@
+import math
+from tkinter import ttk
+
+
+class ToolRowSource:
+    """Serves pages of tool rows for VirtualTreeview.
+
+    Consecutive pages are read with keyset pagination (continuing from the
+    previous page's last key); only a jump to a page whose predecessor is
+    not cached falls back to LIMIT/OFFSET.
+    """
+
+    def __init__(self, db, columns, format_row, page_size=200, order_by="tool_id", descending=False):
+        self.db = db
+        self.columns = columns
+        self.format_row = format_row
+        self.page_size = page_size
+        self.order_by = order_by
+        self.descending = descending
+        self._next_keys = {}
+
+    def reset(self):
+        self._next_keys.clear()
+
+    def count(self):
+        return self.db.count_tools()
+
+    def first_affected_page(self, tool_ids, pages):
+        """Earliest page whose rows shift when tool_ids are inserted, deleted or moved.
+
+        Only tool_id ordering can be reasoned about; any other ordering may
+        move an edited row anywhere, so everything is affected.
+        """
+        if self.order_by != "tool_id":
+            return 0
+        pivot = max(tool_ids) if self.descending else min(tool_ids)
+        ends = {index: key[1] for index, key in self._next_keys.items()}
+        for index, rows in pages.items():
+            if rows:
+                ends.setdefault(index, int(rows[-1][0]))
+        affected = [index for index, last in ends.items() if (last <= pivot if self.descending else last >= pivot)]
+        if affected:
+            return min(affected)
+        return max(ends) + 1 if ends else 0
+
+    def forget_from(self, index):
+        for stale in [page for page in self._next_keys if page >= index]:
+            del self._next_keys[stale]
+
+    def page(self, index):
+        """Return ([(iid, values), ...], next_key) for page index.
+
+        Safe to call from a worker thread; the caller records next_key with
+        remember() once it accepts the page.
+        """
+        after = self._next_keys.get(index - 1) if index > 0 else None
+        offset = 0 if index == 0 or after is not None else index * self.page_size
+        rows, next_key = self.db.fetch_tools_page(self.columns, order_by=self.order_by, descending=self.descending,
+                                                  after=after, limit=self.page_size, offset=offset)
+        return [(str(row[0]), self.format_row(row)) for row in rows], next_key
+
+    def remember(self, index, next_key):
+        if next_key is not None:
+            self._next_keys[index] = next_key
+
+
+class VirtualTreeview(ttk.Frame):
+    """A Treeview that only holds the rows currently on screen.
+
+    Rows come from a source with count() and page(index); a handful of
+    pages around the viewport are cached and the scrollbar is driven from
+    the total row count rather than from the widget's items.
+
+    Source calls go through loader(func, on_success, on_error), which may
+    run them on another thread; by default they run inline.
+    """
+
+    def __init__(self, master, source, columns, cached_pages=6, loader=None, **kwargs):
+        super().__init__(master)
+        self.source = source
+        self.cached_pages = cached_pages
+        self.loader = loader or _run_inline
+        self.total = 0
+        self.first = 0
+        self.visible = 20
+        self._pages = {}
+        self._loading = set()
+        self._epoch = 0  # bumped whenever cached pages become invalid
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", **kwargs)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        self.tree.bind("<Prior>", lambda event: self.scroll(-self.visible))
+        self.tree.bind("<Next>", lambda event: self.scroll(self.visible))
+
+    # Treeview passthroughs used by the dashboard
+    def heading(self, *args, **kwargs):
+        return self.tree.heading(*args, **kwargs)
+
+    def column(self, *args, **kwargs):
+        return self.tree.column(*args, **kwargs)
+
+    def selection(self):
+        return self.tree.selection()
+
+    def item(self, *args, **kwargs):
+        return self.tree.item(*args, **kwargs)
+
+    def __getitem__(self, key):
+        return self.tree[key]
+
+    def refresh(self, to_top=False):
+        """Drop cached pages, re-read the row count and redraw the viewport."""
+        epoch = self._invalidate()
+        self.source.reset()  # keys from before a change of order must not be reused
+        if to_top:
+            self.first = 0
+
+        def counted(total):
+            if epoch != self._epoch:
+                return
+            self._pages.clear()
+            self.source.reset()
+            self.total = total
+            self.first = min(self.first, max(0, self.total - self.visible))
+            self._render()
+
+        self.loader(self.source.count, counted, lambda error: None)
+
+    def apply_changes(self, changed, deleted, total):
+        """Patch changed [(iid, values)] rows and deleted iids into the view.
+
+        Rows already on a cached page are updated in place; inserts and
+        deletes only drop the cached pages from the first one they shift,
+        so the viewport, scroll position and selection are kept.
+        """
+        self._invalidate()
+        self.total = total
+        located = {}
+        for page, rows in self._pages.items():
+            for position, (iid, values) in enumerate(rows):
+                located[iid] = (page, position)
+        shifted = [int(iid) for iid in deleted]
+        for iid, values in changed:
+            if iid in located and self.source.order_by == "tool_id":
+                page, position = located[iid]
+                self._pages[page][position] = (iid, values)
+            else:
+                shifted.append(int(iid))
+        if shifted:
+            first_page = self.source.first_affected_page(shifted, self._pages)
+            self.source.forget_from(first_page)
+            for stale in [page for page in self._pages if page >= first_page]:
+                del self._pages[stale]
+        self.first = min(self.first, max(0, self.total - self.visible))
+        self._render()
+
+    def scroll(self, rows):
+        self._scroll_to(self.first + rows)
+        return "break"
+
+    def yview(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')."""
+        if not args:
+            return self._fractions()
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * self.total))
+        elif args[0] == "scroll":
+            step = self.visible if args[2] == "pages" else 1
+            self._scroll_to(self.first + int(args[1]) * step)
+
+    def _on_wheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def _on_resize(self, event):
+        style = ttk.Style(self)
+        row_height = int(style.lookup("Treeview", "rowheight") or 20)
+        visible = max(1, (event.height - row_height) // row_height)
+        if visible != self.visible:
+            self.visible = visible
+            self._render()
+
+    def _scroll_to(self, first):
+        first = max(0, min(first, max(0, self.total - self.visible)))
+        if first != self.first:
+            self.first = first
+            self._render()
+
+    def _fractions(self):
+        if not self.total:
+            return 0.0, 1.0
+        return self.first / self.total, min(1.0, (self.first + self.visible) / self.total)
+
+    def _invalidate(self):
+        """Make in-flight page loads stale; returns the new epoch."""
+        self._epoch += 1
+        self._loading.clear()
+        return self._epoch
+
+    def _viewport_pages(self):
+        size = self.source.page_size
+        last = min(self.total, self.first + self.visible)
+        return range(self.first // size, (max(last, 1) - 1) // size + 1)
+
+    def _load(self, index):
+        if index in self._loading:
+            return
+        self._loading.add(index)
+        epoch = self._epoch
+
+        def loaded(result):
+            if epoch != self._epoch:
+                return
+            self._loading.discard(index)
+            rows, next_key = result
+            self._pages[index] = rows
+            self.source.remember(index, next_key)
+            # Forget pages far away from the viewport
+            centre = self.first // self.source.page_size
+            for stale in sorted(self._pages, key=lambda page: -abs(page - centre))[:max(0, len(self._pages) - self.cached_pages)]:
+                del self._pages[stale]
+            self._render()
+
+        def failed(error):
+            if epoch == self._epoch:
+                self._loading.discard(index)
+
+        self.loader(lambda: self.source.page(index), loaded, failed)
+
+    def _rows(self):
+        size = self.source.page_size
+        rows = []
+        for page in self._viewport_pages():
+            rows.extend(self._pages.get(page, []))
+        start = self.first - (self.first // size) * size
+        return rows[start:start + self.visible]
+
+    def _render(self):
+        self.scrollbar.set(*self._fractions())
+        missing = [page for page in self._viewport_pages() if page not in self._pages]
+        if missing:
+            # Keep showing the current rows until the pages in view arrive
+            for page in missing:
+                self._load(page)
+            return
+        selected = set(self.tree.selection())
+        self.tree.delete(*self.tree.get_children())
+        for iid, values in self._rows():
+            self.tree.insert("", "end", iid=iid, values=values)
+        keep = [iid for iid in selected if self.tree.exists(iid)]
+        if keep:
+            self.tree.selection_set(keep)
+
+
+class PieChart:
+    """One matplotlib figure embedded for the lifetime of its master widget.
+
+    update() moves the existing wedges and labels when the categories are
+    unchanged and only rebuilds the axes when they are not; either way the
+    canvas is redrawn with draw_idle(), so repeated updates coalesce.
+    """
+
+    def __init__(self, master, figsize=(4, 3), dpi=100, startangle=90):
+        # matplotlib is imported here so it is only loaded once a chart is shown
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self.startangle = startangle
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.ax = self.figure.add_subplot(111)
+        self.canvas = FigureCanvasTkAgg(self.figure, master)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.data = None
+        self._wedges = self._labels = self._pcts = ()
+
+    def update(self, data):
+        data = {label: value for label, value in data.items() if value}
+        if data == self.data:
+            return
+        if self.data is not None and list(data) == list(self.data):
+            self._move_wedges(list(data.values()))
+        else:
+            self._rebuild(data)
+        self.data = data
+        self.canvas.draw_idle()
+
+    def _rebuild(self, data):
+        self.ax.clear()
+        if data:
+            self._wedges, self._labels, self._pcts = self.ax.pie(
+                list(data.values()), labels=list(data), autopct='%1.1f%%', startangle=self.startangle)
+        else:
+            self._wedges = self._labels = self._pcts = ()
+            self.ax.text(0, 0, "No tools", ha="center", va="center")
+        self.ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
+
+    def _move_wedges(self, values):
+        total = float(sum(values))
+        theta = self.startangle
+        for wedge, label, pct, value in zip(self._wedges, self._labels, self._pcts, values):
+            end = theta + 360.0 * value / total
+            wedge.set_theta1(theta)
+            wedge.set_theta2(end)
+            middle = math.radians((theta + end) / 2)
+            x, y = math.cos(middle), math.sin(middle)
+            label.set_position((1.1 * x, 1.1 * y))
+            label.set_horizontalalignment('left' if x > 0 else 'right')
+            pct.set_position((0.6 * x, 0.6 * y))
+            pct.set_text(f"{100.0 * value / total:.1f}%")
+            theta = end
+
+    def close(self):
+        """Release the figure; the Tk widget goes away with its master."""
+        self.figure.clear()
+        self.canvas.get_tk_widget().destroy()
+
+
+def _run_inline(func, on_success, on_error):
+    try:
+        result = func()
+    except Exception as e:
+        on_error(e)
+    else:
+        on_success(result)